@@ -0,0 +1,56 @@
+"""
+Compares two benchmarks.load result files.
+
+    python -m benchmarks.compare benchmarks/results/old.json benchmarks/results/new.json --threshold 0.1
+
+Prints throughput and p95 latency per scenario with the relative change and
+exits with status 1 when any scenario lost more than ``--threshold`` of its
+throughput or its p95 grew by more than that.
+"""
+import argparse
+import json
+import sys
+
+
+def _change(old, new):
+    return (new - old) / old if old else 0.0
+
+
+def compare(old: dict, new: dict, threshold: float) -> list[str]:
+    regressions = []
+    print(f"{'scenario':>20} {'req/s':>17} {'change':>8} {'p95 ms':>17} {'change':>8}")
+    for name, new_result in new['scenarios'].items():
+        old_result = old['scenarios'].get(name)
+        if old_result is None:
+            print(f'{name:>20} (new scenario)')
+            continue
+        rps_change = _change(old_result['rps'], new_result['rps'])
+        p95_change = _change(old_result['p95_ms'], new_result['p95_ms'])
+        flag = ''
+        if rps_change < -threshold or p95_change > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:>20} {old_result['rps']:>8.1f}->{new_result['rps']:<8.1f} {rps_change:>+8.1%} "
+              f"{old_result['p95_ms']:>8.1f}->{new_result['p95_ms']:<8.1f} {p95_change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=0.1)
+    args = parser.parse_args()
+
+    with open(args.old) as old_file, open(args.new) as new_file:
+        old, new = json.load(old_file), json.load(new_file)
+    for key in ('films', 'concurrency', 'duration'):
+        if old.get(key) != new.get(key):
+            print(f"Warning: {key} differs ({old.get(key)} vs {new.get(key)}), the runs are not comparable")
+    print(f"{old.get('commit')} -> {new.get('commit')}")
+    if compare(old, new, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
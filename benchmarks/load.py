@@ -0,0 +1,122 @@
+"""
+Load test of the movies API over a fixed set of scenarios.
+
+    python -m benchmarks.load --url http://127.0.0.1:8000 --concurrency 16 --duration 15
+
+Every scenario (list pages, cursor pages, detail, filtered lists, batch
+lookups) runs for ``--duration`` seconds at ``--concurrency`` clients; the
+throughput and latency percentiles are printed and saved as JSON, by default
+to benchmarks/results/<commit>-<time>.json, for benchmarks.compare.
+
+Film, genre and person ids for the requests are sampled from the database
+the server uses (Django settings), normally seeded with benchmarks.seed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+import django
+
+from .serving import run_load
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+SAMPLE_SIZE = 1000
+
+
+def _sample(cursor, sql):
+    cursor.execute(sql)
+    return [str(row[0]) for row in cursor.fetchall()]
+
+
+def load_samples() -> dict:
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT count(*) FROM content.film_work_read')
+        films = cursor.fetchone()[0]
+        return {
+            'films': films,
+            'film_ids': _sample(cursor, f'SELECT id FROM content.film_work_read ORDER BY random() LIMIT {SAMPLE_SIZE}'),
+            'genre_ids': _sample(cursor, 'SELECT id FROM content.genre'),
+            # Persons with many credits, the expensive case for the person filter.
+            'person_ids': _sample(cursor, 'SELECT person_id FROM content.person_film_work '
+                                          'GROUP BY person_id ORDER BY count(*) DESC LIMIT 50'),
+        }
+
+
+def build_scenarios(samples: dict, rng: random.Random) -> dict:
+    film_ids, genre_ids, person_ids = samples['film_ids'], samples['genre_ids'], samples['person_ids']
+    return {
+        'list_page': lambda: f'/api/v1/movies/?page={rng.randint(1, 20)}',
+        'list_cursor': lambda: f"/api/v1/movies/?cursor=&ordering={rng.choice(('-modified', '-rating'))}",
+        'list_lean': lambda: '/api/v1/movies/?cursor=&fields=title,rating&include=',
+        'detail': lambda: f'/api/v1/movies/{rng.choice(film_ids)}/',
+        'filter_genre_rating': lambda: (
+            f'/api/v1/movies/?cursor=&genre={rng.choice(genre_ids)}&rating_min={rng.randint(5, 8)}'
+        ),
+        'filter_person_role': lambda: f'/api/v1/movies/?cursor=&person={rng.choice(person_ids)}&role=actor',
+        'filter_years': lambda: f'/api/v1/movies/?page=1&year_from={rng.randint(1950, 2000)}&year_to=2010',
+        'batch_ids': lambda: f"/api/v1/movies/?ids={','.join(rng.sample(film_ids, 20))}",
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--scenario', action='append', help='run only these scenarios (repeatable)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', type=Path, help='JSON file for the results')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    django.setup()
+    samples = load_samples()
+    scenarios = build_scenarios(samples, random.Random(args.seed))
+    unknown = set(args.scenario or ()) - set(scenarios)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}; expected some of: {', '.join(scenarios)}")
+
+    commit = _git_commit()
+    report = {
+        'commit': commit,
+        'created': datetime.now(timezone.utc).isoformat(),
+        'url': args.url,
+        'films': samples['films'],
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'scenarios': {},
+    }
+    print(f"{'scenario':>20} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, next_path in scenarios.items():
+        if args.scenario and name not in args.scenario:
+            continue
+        result = asyncio.run(run_load(args.url, next_path, args.concurrency, args.duration, args.timeout))
+        report['scenarios'][name] = result
+        print(f"{name:>20} {result['requests']:>9} {result['errors']:>7} {result['rps']:>8.1f} "
+              f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f}")
+
+    output = args.output or RESULTS_DIR / f"{commit or 'unknown'}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f'Results saved to {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark of the SQLite -> Postgres migration loaders.
+
+    python -m benchmarks.migration --films 20000 --dbname migration_bench
+
+Generates a synthetic SQLite catalog (sqlite_to_postgres.generate_sqlite)
+unless ``--sqlite`` points at one, then migrates it with every loader from
+sqlite_to_postgres.settings.LOADERS into the database from the POSTGRES_*
+variables. Each run happens in a transaction that is rolled back, so all
+loaders start from the same empty tables; the target must not hold a catalog.
+With ``--workers`` above 1 the tables are migrated in parallel
+(sqlite_to_postgres.migrator.migrate_tables_parallel), which commits, and
+the tables are truncated after each run instead.
+Timings are printed and saved as JSON next to the API load results.
+"""
+import argparse
+import json
+import logging
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import psycopg
+from psycopg.rows import dict_row
+
+from sqlite_to_postgres.generate_sqlite import generate
+from sqlite_to_postgres.load_data import setup_postgres_schema
+from sqlite_to_postgres.migrator import migrate_tables_parallel, process_table
+from sqlite_to_postgres.settings import LOADERS, MIGRATION_ORDER, get_pg_dsl
+
+from .load import RESULTS_DIR, _git_commit
+
+
+def run_loader(sqlite_path: Path, pg_dsl: dict, loader: str) -> dict:
+    timings = {}
+    with sqlite3.connect(sqlite_path) as sqlite_conn, \
+            psycopg.connect(**pg_dsl, row_factory=dict_row, options='-c search_path=content') as pg_conn:
+        sqlite_conn.row_factory = sqlite3.Row
+        with pg_conn.transaction(force_rollback=True):
+            started = time.perf_counter()
+            for table_name in MIGRATION_ORDER:
+                table_started = time.perf_counter()
+                process_table(table_name, sqlite_conn, pg_conn, loader=loader)
+                timings[table_name] = time.perf_counter() - table_started
+            total = time.perf_counter() - started
+    return {'seconds': total, 'tables': timings}
+
+
+def run_parallel(sqlite_path: Path, pg_dsl: dict, loader: str, workers: int) -> dict:
+    with psycopg.connect(**pg_dsl, row_factory=dict_row, options='-c search_path=content') as pg_conn:
+        started = time.perf_counter()
+        try:
+            migrate_tables_parallel(pg_dsl, pg_conn, sqlite_path, workers, loader)
+            total = time.perf_counter() - started
+        finally:
+            pg_conn.execute(f"TRUNCATE {', '.join(MIGRATION_ORDER)}")
+            pg_conn.commit()
+    return {'seconds': total, 'workers': workers}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--films', type=int, default=20000, help='size of the generated catalog')
+    parser.add_argument('--sqlite', type=Path, help='migrate this file instead of generating one')
+    parser.add_argument('--dbname', help='target database, overrides POSTGRES_DB')
+    parser.add_argument('--loader', action='append', choices=LOADERS, help='run only these loaders (repeatable)')
+    parser.add_argument('--workers', type=int, default=1, help='tables migrated at the same time')
+    parser.add_argument('--output', type=Path, help='JSON file for the results')
+    args = parser.parse_args()
+
+    # The loaders log every batch; that is not what is being measured.
+    logging.getLogger().setLevel(logging.WARNING)
+    pg_dsl = get_pg_dsl()
+    if args.dbname:
+        pg_dsl['dbname'] = args.dbname
+
+    with psycopg.connect(**pg_dsl) as pg_conn:
+        with pg_conn.transaction():
+            setup_postgres_schema(pg_conn)
+        if pg_conn.execute('SELECT EXISTS (SELECT 1 FROM content.film_work)').fetchone()[0]:
+            raise SystemExit('content.film_work is not empty, point --dbname at a scratch database')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_path = args.sqlite
+        if sqlite_path is None:
+            sqlite_path = Path(tmp) / 'movies.sqlite'
+            counts = generate(sqlite_path, films=args.films)
+            print(', '.join(f'{count} {table}' for table, count in counts.items()))
+        with sqlite3.connect(sqlite_path) as sqlite_conn:
+            rows = sum(sqlite_conn.execute(f'SELECT count(*) FROM {table}').fetchone()[0] for table in MIGRATION_ORDER)
+
+        commit = _git_commit()
+        report = {
+            'commit': commit,
+            'created': datetime.now(timezone.utc).isoformat(),
+            'rows': rows,
+            'loaders': {},
+        }
+        print(f"{'loader':>8} {'seconds':>9} {'rows/s':>10}")
+        for loader in args.loader or LOADERS:
+            if args.workers > 1:
+                result = run_parallel(sqlite_path, pg_dsl, loader, args.workers)
+            else:
+                result = run_loader(sqlite_path, pg_dsl, loader)
+            result['rows_per_second'] = rows / result['seconds']
+            report['loaders'][loader] = result
+            print(f"{loader:>8} {result['seconds']:>9.1f} {result['rows_per_second']:>10.0f}")
+
+    output = args.output or RESULTS_DIR / f"migration-{commit or 'unknown'}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f'Results saved to {output}')
+
+
+if __name__ == '__main__':
+    main()
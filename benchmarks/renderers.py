@@ -0,0 +1,72 @@
+"""
+Micro-benchmark of the API JSON renderers.
+
+Serializes pages of synthetic film rows shaped like ``FilmWorkRead.values()``
+output (UUIDs, dates, floats, name arrays) with every available renderer and
+prints the time per page and the speed-up over DjangoJsonRenderer.
+
+    python -m benchmarks.renderers [--page-sizes 50 500 5000] [--repeat 5]
+"""
+import argparse
+import random
+import string
+import timeit
+import uuid
+from datetime import date, timedelta
+
+from movies.api.v1.renderers import DjangoJsonRenderer, OrjsonRenderer, orjson
+
+
+def _name(rng):
+    return ' '.join(
+        rng.choice(string.ascii_uppercase) + ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+        for _ in range(2)
+    )
+
+
+def make_rows(count: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        rows.append({
+            'id': uuid.UUID(int=rng.getrandbits(128)),
+            'title': ' '.join(_name(rng) for _ in range(2)),
+            'description': ' '.join(_name(rng) for _ in range(25)),
+            'creation_date': date(1950, 1, 1) + timedelta(days=rng.randint(0, 27000)),
+            'rating': round(rng.uniform(0, 10), 1),
+            'type': rng.choice(('movie', 'tv_show')),
+            'genres': [_name(rng) for _ in range(rng.randint(1, 4))],
+            'actors': [_name(rng) for _ in range(rng.randint(3, 15))],
+            'directors': [_name(rng) for _ in range(rng.randint(1, 2))],
+            'writers': [_name(rng) for _ in range(rng.randint(1, 4))],
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--page-sizes', type=int, nargs='+', default=[50, 500, 5000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    renderers = [DjangoJsonRenderer()]
+    if orjson is not None:
+        renderers.append(OrjsonRenderer())
+    else:
+        print('orjson is not installed, only DjangoJsonRenderer is measured')
+
+    print(f"{'page size':>10} {'renderer':>20} {'ms/page':>10} {'rows/s':>12} {'KiB':>8} {'speed-up':>9}")
+    for page_size in args.page_sizes:
+        page = {'count': page_size, 'total_pages': 1, 'prev': None, 'next': None, 'results': make_rows(page_size)}
+        number = max(1, 20000 // page_size)
+        baseline = None
+        for renderer in renderers:
+            best = min(timeit.repeat(lambda: renderer.render(page), number=number, repeat=args.repeat)) / number
+            baseline = baseline or best
+            size = len(renderer.render(page)) / 1024
+            print(f"{page_size:>10} {type(renderer).__name__:>20} {best * 1000:>10.3f} "
+                  f"{page_size / best:>12,.0f} {size:>8.0f} {baseline / best:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""
+Seeds the configured Postgres database with a synthetic catalog.
+
+    python -m benchmarks.seed --size medium --reset
+
+Sizes are 10k (small), 100k (medium) and 1M (large) films, or any number with
+``--films``. The catalog is generated deterministically from ``--seed``:
+persons appear with a long-tailed popularity (a few in thousands of films,
+most in a handful), films get 1-3 genres, 3-15 actors, 1-2 directors and
+1-3 writers. Rows are loaded with COPY; the film_work_read triggers are
+switched off during the load and the read model is rebuilt in batches
+afterwards, which is much faster than refreshing it per statement.
+
+Uses the Django database settings (POSTGRES_DB, DB_HOST, ...).
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from itertools import accumulate
+
+import django
+
+SIZES = {'small': 10_000, 'medium': 100_000, 'large': 1_000_000}
+GENRES = (
+    'Action', 'Adventure', 'Animation', 'Biography', 'Comedy', 'Crime', 'Documentary', 'Drama',
+    'Family', 'Fantasy', 'History', 'Horror', 'Music', 'Musical', 'Mystery', 'News', 'Reality-TV',
+    'Romance', 'Sci-Fi', 'Short', 'Sport', 'Talk-Show', 'Thriller', 'War', 'Western', 'Game-Show',
+)
+SYLLABLES = ('ka', 'lo', 'mi', 'ra', 'ven', 'tor', 'an', 'el', 'is', 'dor', 'mar', 'sin', 'qu', 'bel', 'ro')
+WORDS = (
+    'the', 'of', 'night', 'star', 'return', 'last', 'city', 'love', 'war', 'dark', 'secret', 'king',
+    'river', 'road', 'house', 'dream', 'fire', 'shadow', 'summer', 'ghost', 'blood', 'light', 'man',
+)
+TABLES = ('genre_film_work', 'person_film_work', 'film_work_read', 'film_work', 'genre', 'person')
+TRIGGER_TABLES = ('film_work', 'genre_film_work', 'person_film_work', 'genre', 'person')
+# Tables with a content.row_count counter (migration 0009).
+COUNTED_TABLES = ('film_work', 'film_work_read', 'genre', 'person')
+REFRESH_BATCH = 10_000
+
+
+def _name(rng):
+    def word():
+        return ''.join(rng.choices(SYLLABLES, k=rng.randint(2, 3))).capitalize()
+    return f'{word()} {word()}'
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choices(WORDS, k=words)).capitalize()
+
+
+def _uuid(rng):
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+class CatalogGenerator:
+    def __init__(self, films: int, seed: int):
+        self.films = films
+        self.rng = random.Random(seed)
+        self.now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.genre_ids = [_uuid(self.rng) for _ in GENRES]
+        self.person_ids = [_uuid(self.rng) for _ in range(max(films // 2, 10))]
+        # Pareto weights: a small head of persons gets most of the credits.
+        weights = [self.rng.paretovariate(2.0) for _ in self.person_ids]
+        self.person_weights = list(accumulate(weights))
+        self.genre_weights = list(accumulate(1 / (rank + 1) for rank in range(len(GENRES))))
+
+    def genres(self):
+        for genre_id, name in zip(self.genre_ids, GENRES):
+            yield genre_id, name, _sentence(self.rng, 8), self.now, self.now
+
+    def persons(self):
+        for person_id in self.person_ids:
+            yield person_id, _name(self.rng), self.now, self.now
+
+    def films_with_links(self):
+        """Yields (film row, genre link rows, person link rows) per film."""
+        rng = self.rng
+        for number in range(self.films):
+            film_id = _uuid(rng)
+            modified = self.now - timedelta(seconds=rng.randint(0, 5 * 365 * 86400))
+            film = (
+                film_id,
+                _sentence(rng, rng.randint(1, 5)),
+                _sentence(rng, rng.randint(10, 60)),
+                date(1920, 1, 1) + timedelta(days=rng.randint(0, 38000)) if rng.random() > 0.05 else None,
+                round(rng.uniform(1, 10), 1) if rng.random() > 0.1 else None,
+                'movie' if rng.random() < 0.8 else 'tv_show',
+                modified,
+                modified,
+            )
+            genres = set(rng.choices(self.genre_ids, cum_weights=self.genre_weights, k=rng.randint(1, 3)))
+            genre_links = [(_uuid(rng), genre_id, film_id, modified) for genre_id in genres]
+            person_links = []
+            for role, low, high in (('actor', 3, 15), ('director', 1, 2), ('writer', 1, 3)):
+                persons = set(rng.choices(self.person_ids, cum_weights=self.person_weights, k=rng.randint(low, high)))
+                person_links.extend((_uuid(rng), person_id, film_id, role, modified) for person_id in persons)
+            yield film, genre_links, person_links
+
+
+def _copy(cursor, table, columns, rows):
+    with cursor.copy(f'COPY content.{table} ({", ".join(columns)}) FROM STDIN') as copy:
+        for row in rows:
+            copy.write_row(row)
+
+
+def _copy_spooled(cursor, table, columns, spool):
+    spool.seek(0)
+    with cursor.copy(f'COPY content.{table} ({", ".join(columns)}) FROM STDIN (FORMAT csv)') as copy:
+        while data := spool.read(1 << 20):
+            copy.write(data)
+
+
+def _refresh_read_model(cursor):
+    """Rebuilds film_work_read in id order, REFRESH_BATCH films per statement."""
+    last_id = uuid.UUID(int=0)
+    while last_id is not None:
+        cursor.execute(
+            'SELECT id FROM content.film_work WHERE id > %s ORDER BY id OFFSET %s LIMIT 1',
+            [last_id, REFRESH_BATCH - 1],
+        )
+        row = cursor.fetchone()
+        batch_end = row[0] if row else None
+        cursor.execute(
+            'SELECT content.film_work_read_refresh(ARRAY('
+            'SELECT id FROM content.film_work WHERE id > %s AND (%s::uuid IS NULL OR id <= %s)))',
+            [last_id, batch_end, batch_end],
+        )
+        last_id = batch_end
+
+
+def seed(films: int, seed_value: int, reset: bool):
+    from django.db import connection, transaction
+
+    generator = CatalogGenerator(films, seed_value)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('SELECT EXISTS (SELECT 1 FROM content.film_work)')
+        if cursor.fetchone()[0]:
+            if not reset:
+                raise SystemExit('content.film_work is not empty, pass --reset to replace the catalog')
+            cursor.execute(f"TRUNCATE {', '.join(f'content.{table}' for table in TABLES)}")
+        for table in TRIGGER_TABLES:
+            cursor.execute(f'ALTER TABLE content.{table} DISABLE TRIGGER USER')
+
+        raw = cursor.cursor
+        _copy(raw, 'genre', ('id', 'name', 'description', 'created', 'modified'), generator.genres())
+        _copy(raw, 'person', ('id', 'full_name', 'created', 'modified'), generator.persons())
+
+        # Links reference the films, so they are spooled to disk and copied after them.
+        with tempfile.TemporaryFile('w+', newline='') as genre_spool, \
+                tempfile.TemporaryFile('w+', newline='') as person_spool:
+            genre_writer, person_writer = csv.writer(genre_spool), csv.writer(person_spool)
+            counts = {'films': 0, 'genre links': 0, 'person links': 0}
+
+            def film_rows():
+                for film, film_genres, film_persons in generator.films_with_links():
+                    genre_writer.writerows(film_genres)
+                    person_writer.writerows(film_persons)
+                    counts['films'] += 1
+                    counts['genre links'] += len(film_genres)
+                    counts['person links'] += len(film_persons)
+                    yield film
+
+            _copy(raw, 'film_work',
+                  ('id', 'title', 'description', 'creation_date', 'rating', 'type', 'created', 'modified'),
+                  film_rows())
+            _copy_spooled(raw, 'genre_film_work', ('id', 'genre_id', 'film_work_id', 'created'), genre_spool)
+            _copy_spooled(raw, 'person_film_work', ('id', 'person_id', 'film_work_id', 'role', 'created'),
+                          person_spool)
+        print(', '.join(f'{count} {name}' for name, count in counts.items()))
+
+        for table in TRIGGER_TABLES:
+            cursor.execute(f'ALTER TABLE content.{table} ENABLE TRIGGER USER')
+        _refresh_read_model(cursor)
+        # The row_count triggers were disabled together with the others.
+        for table in COUNTED_TABLES:
+            cursor.execute('SELECT content.row_count_refresh(%s)', [table])
+
+    with connection.cursor() as cursor:
+        for table in TABLES:
+            cursor.execute(f'ANALYZE content.{table}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument('--size', choices=SIZES, default='small')
+    size.add_argument('--films', type=int)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--reset', action='store_true', help='replace an existing catalog')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    django.setup()
+    started = time.monotonic()
+    seed(args.films or SIZES[args.size], args.seed, args.reset)
+    print(f'Seeded in {time.monotonic() - started:.1f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Side-by-side load test of the WSGI (uWSGI) and ASGI (uvicorn) deployments.
+
+Start both servers against the same database, e.g.
+
+    uwsgi --http-socket :8001 --module config.wsgi:application --master --processes 4 --threads 2
+    uvicorn config.asgi:application --port 8002 --workers 1
+
+and run
+
+    python -m benchmarks.serving --target wsgi=http://127.0.0.1:8001 --target asgi=http://127.0.0.1:8002 \\
+        --path '/api/v1/movies/?page=3' --concurrency 8 64 256 --duration 10
+
+Each client opens a connection per request and sends the next one as soon as
+the previous answer arrives; throughput, latency percentiles and errors are
+reported per target and concurrency level.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+async def _request(host: str, port: int, path: str, timeout: float) -> int:
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n'.encode())
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+        await asyncio.wait_for(reader.read(), timeout)
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def _client(url, next_path, deadline, timeout, latencies, errors):
+    parts = urlsplit(url)
+    while time.monotonic() < deadline:
+        path = next_path()
+        started = time.monotonic()
+        try:
+            status = await _request(parts.hostname, parts.port or 80, path, timeout)
+        except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+            status = None
+        if status == 200:
+            latencies.append(time.monotonic() - started)
+        else:
+            errors.append(status)
+
+
+async def run_load(url: str, path, concurrency: int, duration: float, timeout: float) -> dict:
+    """Drives ``url`` for ``duration`` seconds; ``path`` is a fixed path or a callable returning the next one."""
+    next_path = path if callable(path) else lambda: path
+    latencies, errors = [], []
+    started = time.monotonic()
+    await asyncio.gather(*(
+        _client(url, next_path, started + duration, timeout, latencies, errors) for _ in range(concurrency)
+    ))
+    elapsed = time.monotonic() - started
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': len(latencies) / elapsed,
+        'p50_ms': quantiles[49] * 1000,
+        'p95_ms': quantiles[94] * 1000,
+        'p99_ms': quantiles[98] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--target', action='append', required=True, help='name=base URL, repeat for each server')
+    parser.add_argument('--path', default='/api/v1/movies/?page=3')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[8, 64, 256])
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--timeout', type=float, default=30)
+    args = parser.parse_args()
+
+    print(f"{'target':>8} {'clients':>8} {'requests':>9} {'errors':>7} {'req/s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for concurrency in args.concurrency:
+        for target in args.target:
+            name, url = target.split('=', 1)
+            result = asyncio.run(run_load(url, args.path, concurrency, args.duration, args.timeout))
+            print(f"{name:>8} {concurrency:>8} {result['requests']:>9} {result['errors']:>7} {result['rps']:>8.1f} "
+                  f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
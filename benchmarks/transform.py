@@ -0,0 +1,148 @@
+"""
+Micro-benchmark of the SQLite row -> dataclass transform of the migration.
+
+Reads every table of a generated catalog (sqlite_to_postgres.generate_sqlite)
+into memory in BATCH_SIZE batches and transforms it twice: with the original
+per-row path, kept below as the baseline, and with etl.transform_to_dataclass.
+Prints rows per second for both and checks that they produce the same values.
+
+    python -m benchmarks.transform [--films 64000] [--sqlite movies.sqlite] [--repeat 3]
+
+64000 films make about a million rows.
+"""
+import argparse
+import logging
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass, fields, make_dataclass
+from datetime import date, datetime
+from pathlib import Path
+from uuid import UUID
+
+from sqlite_to_postgres.data_models import NULL_MARKERS, _parse_datetime
+from sqlite_to_postgres.etl import extract_sqlite_data, transform_to_dataclass
+from sqlite_to_postgres.generate_sqlite import generate
+from sqlite_to_postgres.settings import MIGRATION_ORDER, TABLE_CONFIGS
+
+
+@dataclass
+class BaselineDataClass:
+    """BaseDataClass before the per-class converters: inspects the annotations of every row."""
+    def __post_init__(self):
+        for field in fields(self):
+            value = getattr(self, field.name)
+            if value is None:
+                continue
+
+            field_type = field.type
+            if hasattr(field_type, '__args__'):
+                actual_types = [t for t in field_type.__args__ if t is not type(None)]
+                if len(actual_types) == 1:
+                    field_type = actual_types[0]
+                if isinstance(value, str) and value.strip() in NULL_MARKERS:
+                    setattr(self, field.name, None)
+                    continue
+
+            try:
+                if field_type == UUID and isinstance(value, str):
+                    setattr(self, field.name, UUID(value))
+                elif field_type == datetime and isinstance(value, str):
+                    parsed_dt = _parse_datetime(value)
+                    if parsed_dt:
+                        setattr(self, field.name, parsed_dt)
+                    else:
+                        raise ValueError(f"Could not parse datetime string '{value}'")
+                elif field_type == date and isinstance(value, str):
+                    setattr(self, field.name, datetime.strptime(value, '%Y-%m-%d').date())
+                elif field_type == float and isinstance(value, str):
+                    setattr(self, field.name, float(value.strip().replace(',', '.')))
+                elif field_type == float and not isinstance(value, float):
+                    setattr(self, field.name, float(value))
+            except (ValueError, TypeError) as e:
+                logging.warning(
+                    f"Could not convert value '{value}' for field '{field.name}' in {self.__class__.__name__}"
+                    f"(id={getattr(self, 'id', 'N/A')}). Error: {e}. Setting to None."
+                )
+                setattr(self, field.name, None)
+
+
+def baseline_transform(batch: list[sqlite3.Row], config: dict, data_class: type) -> list:
+    """etl.transform_to_dataclass before the row converters: remaps a dict per row."""
+    column_mappings = config.get("column_mappings", {})
+    columns_to_drop = config.get("columns_to_drop", [])
+
+    transformed_batch = []
+    for row_data in batch:
+        mapped_row_data = dict(row_data)
+        for source_col, target_col in column_mappings.items():
+            if source_col in mapped_row_data:
+                mapped_row_data[target_col] = mapped_row_data.pop(source_col)
+        for col_to_drop in columns_to_drop:
+            mapped_row_data.pop(col_to_drop, None)
+        try:
+            transformed_batch.append(data_class(**mapped_row_data))
+        except Exception as e:
+            logging.error(f"Error transforming row for {data_class.__name__}: {e}")
+    return transformed_batch
+
+
+def _values(records: list) -> list[tuple]:
+    return [tuple(getattr(record, field.name) for field in fields(record)) for record in records]
+
+
+def _best_time(transform, batches, repeat: int) -> tuple[float, list]:
+    best, records = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        records = [record for batch in batches for record in transform(batch)]
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--films', type=int, default=64000, help='size of the generated catalog')
+    parser.add_argument('--sqlite', type=Path, help='read this file instead of generating one')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per path, the best one counts')
+    args = parser.parse_args()
+
+    # Both paths log the values they cannot convert; that is not what is being measured.
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_path = args.sqlite
+        if sqlite_path is None:
+            sqlite_path = Path(tmp) / 'movies.sqlite'
+            generate(sqlite_path, films=args.films)
+        with sqlite3.connect(sqlite_path) as sqlite_conn:
+            sqlite_conn.row_factory = sqlite3.Row
+            tables = {
+                table_name: list(extract_sqlite_data(sqlite_conn.cursor(), TABLE_CONFIGS[table_name]["sqlite_source_table"]))
+                for table_name in MIGRATION_ORDER
+            }
+
+    print(f"{'table':>17} {'rows':>9} {'baseline rows/s':>16} {'rows/s':>10} {'speed-up':>9}")
+    totals = [0, 0.0, 0.0]
+    for table_name, batches in tables.items():
+        config = TABLE_CONFIGS[table_name]
+        data_class = config["dataclass"]
+        baseline_class = make_dataclass(
+            f'Baseline{data_class.__name__}',
+            [(field.name, field.type) for field in fields(data_class)],
+            bases=(BaselineDataClass,),
+        )
+        rows = sum(len(batch) for batch in batches)
+        baseline, expected = _best_time(lambda batch: baseline_transform(batch, config, baseline_class), batches, args.repeat)
+        current, records = _best_time(lambda batch: transform_to_dataclass(batch, config), batches, args.repeat)
+        assert _values(records) == _values(expected), f'{table_name}: the transforms disagree'
+        totals[0] += rows
+        totals[1] += baseline
+        totals[2] += current
+        print(f'{table_name:>17} {rows:>9} {rows / baseline:>16.0f} {rows / current:>10.0f} {baseline / current:>8.1f}x')
+    rows, baseline, current = totals
+    print(f"{'total':>17} {rows:>9} {rows / baseline:>16.0f} {rows / current:>10.0f} {baseline / current:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
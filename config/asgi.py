@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# Under ASGI the movies list/detail are served by movies.api.v1.async_views.
+os.environ.setdefault('MOVIES_API_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -0,0 +1,142 @@
+"""
+PostgreSQL backend that borrows connections from a psycopg_pool.ConnectionPool.
+
+Django 4.2 has no built-in pooling: with CONN_MAX_AGE = 0 every request opens
+and authenticates a new connection. Here "connecting" checks a connection out
+of a per-process pool and "closing" at the end of the request returns it, so
+connection setup happens once per pooled connection instead of per request.
+
+Enabled through ``OPTIONS['pool']`` (keyword arguments of ConnectionPool, e.g.
+``min_size``, ``max_size``, ``timeout``). Pools are opened lazily, or up front
+by ``open_pools()`` when a worker starts; they must not be opened before the
+server forks its workers (see ``lazy-apps`` in uwsgi.ini).
+"""
+import threading
+import time
+
+from django.db import connections
+from django.db.backends.postgresql import base, creation
+from django.utils.asyncio import async_unsafe
+from psycopg import IsolationLevel
+from psycopg_pool import ConnectionPool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolStats:
+    """Checkout latency as seen by the request, on top of the pool's own counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_ms = 0.0
+        self.max_checkout_ms = 0.0
+
+    def record(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_ms += elapsed_ms
+            self.max_checkout_ms = max(self.max_checkout_ms, elapsed_ms)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'avg_checkout_ms': self.checkout_ms / self.checkouts if self.checkouts else 0.0,
+                'max_checkout_ms': self.max_checkout_ms,
+            }
+
+
+def _pool_key(alias, conn_params):
+    # Test runs switch NAME to the test database, which needs a pool of its own.
+    return alias, conn_params.get('dbname'), conn_params.get('host'), conn_params.get('port'), conn_params.get('user')
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Pooled connections to the test database would block DROP DATABASE.
+        close_pools(test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The pool self.connection was checked out of, to return it to.
+        self.connection_pool = None
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    def get_pool(self, conn_params=None):
+        """Returns the process-wide pool for this alias and connection parameters, creating it if needed."""
+        if conn_params is None:
+            conn_params = self.get_connection_params()
+        key = _pool_key(self.alias, conn_params)
+        with _pools_lock:
+            if key not in _pools:
+                pool = ConnectionPool(
+                    kwargs=conn_params,
+                    name=self.alias,
+                    open=False,
+                    **self.settings_dict['OPTIONS'].get('pool', {}),
+                )
+                pool.open()
+                _pools[key] = (pool, PoolStats())
+            return _pools[key]
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        self.isolation_level = IsolationLevel(isolation_level) if isolation_level else IsolationLevel.READ_COMMITTED
+        pool, stats = self.get_pool(conn_params)
+        started = time.perf_counter()
+        connection = pool.getconn()
+        stats.record((time.perf_counter() - started) * 1000)
+        if isolation_level:
+            connection.isolation_level = self.isolation_level
+        self.connection_pool = pool
+        return connection
+
+    @async_unsafe
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            # The pool rolls back anything left open and discards broken connections.
+            self.connection_pool.putconn(self.connection)
+            self.connection = None
+            self.connection_pool = None
+
+
+def open_pools(wait: bool = True, timeout: float = 30.0) -> None:
+    """Opens the pools of all pooled aliases and, with ``wait``, fills them to ``min_size``."""
+    for alias in connections:
+        wrapper = connections[alias]
+        if isinstance(wrapper, DatabaseWrapper):
+            pool, _ = wrapper.get_pool()
+            if wait:
+                pool.wait(timeout=timeout)
+
+
+def close_pools(dbname: str | None = None) -> None:
+    with _pools_lock:
+        for key in [key for key in _pools if dbname is None or key[1] == dbname]:
+            pool, _ = _pools.pop(key)
+            pool.close()
+
+
+def pool_stats() -> dict:
+    """Current size, wait and checkout counters of every open pool, keyed by alias and database."""
+    with _pools_lock:
+        pools = list(_pools.items())
+    return {
+        f'{alias}:{dbname}': {**pool.get_stats(), **stats.as_dict()}
+        for (alias, dbname, *_), (pool, stats) in pools
+    }
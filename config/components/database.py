@@ -2,11 +2,24 @@ import os
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        # django.db.backends.postgresql with a per-process connection pool.
+        'ENGINE': 'config.backends.postgresql_pool',
         'NAME': os.environ.get('POSTGRES_DB'),
         'USER': os.environ.get('POSTGRES_USER'),
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD'),
         'HOST': os.environ.get('DB_HOST'),
         'PORT': os.environ.get('DB_PORT'),
+        # Connections go back to the pool at the end of every request.
+        'CONN_MAX_AGE': 0,
+        'OPTIONS': {
+            'pool': {
+                'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+                'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 4)),
+                # Seconds a request may wait for a free connection before failing.
+                'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+                # Connections are recycled after this many seconds.
+                'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', 1800)),
+            },
+        },
     }
 }
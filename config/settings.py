@@ -38,9 +38,11 @@ ALLOWED_HOSTS = [
 # Elasticsearch settings for Django-DSL
 ELASTICSEARCH_DSL = {
     'default': {
-        'hosts': [f"{os.environ.get('ES_HOST', 'elasticsearch')}:{os.environ.get('ES_PORT', '9200')}"],
+        'hosts': [f"http://{os.environ.get('ES_HOST', 'elasticsearch')}:{os.environ.get('ES_PORT', '9200')}"],
+        'request_timeout': float(os.environ.get('ES_REQUEST_TIMEOUT', 5)),
     }
 }
+ES_INDEX_MOVIES = 'movies'
 
 # Application definition
 
@@ -56,6 +58,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'movies.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
@@ -136,8 +139,17 @@ LOGGING = {
             'formatter': 'default',
             'filters': ['require_debug_true'],
         },
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'default',
+        },
     },
     'loggers': {
+        'movies': {
+            'level': os.environ.get('MOVIES_LOG_LEVEL', 'INFO'),
+            'handlers': ['console'],
+            'propagate': False,
+        },
         'django.db.backends': {
             'level': 'INFO',
             'handlers': ['debug-console'],
@@ -178,3 +190,34 @@ STATICFILES_DIRS = (
 )
 
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+# Movies API
+MOVIES_API_PAGE_SIZE = int(os.environ.get('MOVIES_API_PAGE_SIZE', 50))
+# Largest number of films one ?ids= batch request may ask for.
+MOVIES_API_BATCH_MAX_SIZE = int(os.environ.get('MOVIES_API_BATCH_MAX_SIZE', 100))
+MOVIES_API_EXPORT_CHUNK_SIZE = int(os.environ.get('MOVIES_API_EXPORT_CHUNK_SIZE', 2000))
+MOVIES_API_CACHE_SIZE = int(os.environ.get('MOVIES_API_CACHE_SIZE', 1024))
+MOVIES_API_CACHE_TTL = float(os.environ.get('MOVIES_API_CACHE_TTL', 30))
+# Alias from CACHES for the cache shared between workers; disabled when empty.
+MOVIES_API_CACHE_BACKEND = os.environ.get('MOVIES_API_CACHE_BACKEND') or None
+MOVIES_API_SHARED_CACHE_TTL = int(os.environ.get('MOVIES_API_SHARED_CACHE_TTL', 3600))
+# Lifetime of the genre list with film counts inside a worker.
+MOVIES_API_GENRES_CACHE_TTL = float(os.environ.get('MOVIES_API_GENRES_CACHE_TTL', 300))
+# Addresses allowed to call the internal API endpoints (cache stats and the like).
+INTERNAL_API_ALLOWED_IPS = os.environ.get('INTERNAL_API_ALLOWED_IPS', '127.0.0.1').split(',')
+# Set by config/asgi.py: serve the movies list/detail with the async views.
+MOVIES_API_ASYNC_VIEWS = os.environ.get('MOVIES_API_ASYNC_VIEWS', '') == '1'
+# Connection pool of the async views, per ASGI worker process.
+MOVIES_API_ASYNC_POOL_MIN_SIZE = int(os.environ.get('MOVIES_API_ASYNC_POOL_MIN_SIZE', 2))
+MOVIES_API_ASYNC_POOL_MAX_SIZE = int(os.environ.get('MOVIES_API_ASYNC_POOL_MAX_SIZE', 20))
+# API requests running more SQL queries than this are logged by MetricsMiddleware.
+MOVIES_API_QUERY_BUDGET = int(os.environ.get('MOVIES_API_QUERY_BUDGET', 10))
+# Filtered lists estimated by the planner above this many rows are not counted exactly.
+MOVIES_EXACT_COUNT_THRESHOLD = int(os.environ.get('MOVIES_EXACT_COUNT_THRESHOLD', 10000))
+MOVIES_API_JSON_RENDERER = os.environ.get('MOVIES_API_JSON_RENDERER', 'movies.api.v1.renderers.OrjsonRenderer')
+
+# Movies admin
+# Rows returned by the person/genre autocomplete for one term.
+MOVIES_ADMIN_AUTOCOMPLETE_LIMIT = int(os.environ.get('MOVIES_ADMIN_AUTOCOMPLETE_LIMIT', 20))
+MOVIES_ADMIN_AUTOCOMPLETE_CACHE_SIZE = int(os.environ.get('MOVIES_ADMIN_AUTOCOMPLETE_CACHE_SIZE', 1024))
+MOVIES_ADMIN_AUTOCOMPLETE_CACHE_TTL = float(os.environ.get('MOVIES_ADMIN_AUTOCOMPLETE_CACHE_TTL', 60))
@@ -27,5 +27,7 @@ urlpatterns = [
     path('api/v1/', include('movies.api.v1.urls')),
 ]
 
+handler400 = 'movies.api.v1.views.bad_request'
+
 if settings.DEBUG:
     urlpatterns.append(path('__debug__/', include('debug_toolbar.urls')))
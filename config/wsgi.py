@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# Fill the connection pool before the first request arrives. uWSGI loads the
+# application in each worker (lazy-apps), so every worker gets its own pool.
+from config.backends.postgresql_pool.base import open_pools  # noqa: E402
+
+open_pools()
@@ -0,0 +1,141 @@
+"""
+Async execution of ORM-built querysets for the ASGI views.
+
+Django 4.2 runs its async ORM methods in a single thread through
+sync_to_async, so concurrent requests still wait for each other. Here the
+SQL of a queryset is compiled by Django and executed on a psycopg
+AsyncConnectionPool, so one event loop can keep many queries in flight.
+
+Rows come back as dicts keyed by column alias, exactly as ``values()`` would
+return them, but without Django's field converters: only use it for
+querysets whose columns psycopg already loads as the right Python types.
+"""
+import asyncio
+import time
+
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from psycopg import AsyncClientCursor
+from psycopg.conninfo import make_conninfo
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from movies.metrics import record_query
+
+_pool = None
+_pool_opened = None
+
+
+def _make_pool(alias: str = 'default') -> AsyncConnectionPool:
+    database = settings.DATABASES[alias]
+    params = {
+        'dbname': database['NAME'],
+        'user': database['USER'],
+        'password': database['PASSWORD'],
+        'host': database['HOST'],
+        'port': database['PORT'],
+    }
+    conninfo = make_conninfo(**{key: value for key, value in params.items() if value})
+    return AsyncConnectionPool(
+        conninfo,
+        min_size=settings.MOVIES_API_ASYNC_POOL_MIN_SIZE,
+        max_size=settings.MOVIES_API_ASYNC_POOL_MAX_SIZE,
+        kwargs={
+            'autocommit': True,
+            # Django binds parameters on the client side, its SQL relies on that.
+            'cursor_factory': AsyncClientCursor,
+            'options': f'-c TimeZone={connections[alias].timezone_name}',
+        },
+        open=False,
+    )
+
+
+async def get_pool() -> AsyncConnectionPool:
+    """Returns the process-wide pool, opening it on first use in the running event loop."""
+    global _pool, _pool_opened
+    if _pool is None:
+        _pool = _make_pool()
+        _pool_opened = asyncio.ensure_future(_pool.open(wait=True))
+    await _pool_opened
+    return _pool
+
+
+def pool_stats() -> dict | None:
+    return _pool.get_stats() if _pool is not None else None
+
+
+def compile_queryset(queryset) -> tuple[str, tuple]:
+    return queryset.query.get_compiler(using=queryset.db).as_sql()
+
+
+async def fetch_all(queryset) -> list[dict]:
+    try:
+        sql, params = compile_queryset(queryset)
+    except EmptyResultSet:
+        return []
+    pool = await get_pool()
+    async with pool.connection() as connection:
+        cursor = connection.cursor(row_factory=dict_row)
+        started = time.perf_counter()
+        await cursor.execute(sql, params)
+        rows = await cursor.fetchall()
+        record_query(time.perf_counter() - started)
+        return rows
+
+
+async def stream(queryset, chunk_size: int):
+    """
+    Yields the rows of a queryset read through a server-side cursor,
+    ``chunk_size`` rows per round trip. The connection and its transaction are
+    held until the generator is exhausted or closed.
+    """
+    try:
+        sql, params = compile_queryset(queryset)
+    except EmptyResultSet:
+        return
+    pool = await get_pool()
+    # Recorded as one query, the round trips of a Django iterator() are not
+    # counted separately either, so a long export stays within the query budget.
+    elapsed = 0.0
+    try:
+        async with pool.connection() as connection, connection.transaction():
+            cursor = connection.cursor(row_factory=dict_row)
+            started = time.perf_counter()
+            await cursor.execute(f'DECLARE stream_cursor NO SCROLL CURSOR FOR {sql}', params)
+            elapsed += time.perf_counter() - started
+            while True:
+                started = time.perf_counter()
+                await cursor.execute(f'FETCH FORWARD {int(chunk_size)} FROM stream_cursor')
+                rows = await cursor.fetchall()
+                elapsed += time.perf_counter() - started
+                if not rows:
+                    return
+                for row in rows:
+                    yield row
+    finally:
+        record_query(elapsed)
+
+
+async def fetch_one(queryset) -> dict | None:
+    rows = await fetch_all(queryset[:1])
+    return rows[0] if rows else None
+
+
+async def fetch_value(sql: str, params) -> object:
+    """Runs raw SQL and returns the first column of the first row."""
+    pool = await get_pool()
+    async with pool.connection() as connection:
+        started = time.perf_counter()
+        cursor = await connection.execute(sql, params)
+        (value,) = await cursor.fetchone()
+        record_query(time.perf_counter() - started)
+        return value
+
+
+async def fetch_count(queryset) -> int:
+    try:
+        sql, params = compile_queryset(queryset.order_by().values('pk'))
+    except EmptyResultSet:
+        return 0
+    return await fetch_value(f'SELECT COUNT(*) FROM ({sql}) AS subquery', params)
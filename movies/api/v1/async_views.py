@@ -0,0 +1,95 @@
+"""
+Async versions of the film list and detail views for ASGI deployments.
+
+They reuse the querysets and response layout of the sync views and run the
+queries through async_db, so a request waiting for Postgres does not hold a
+worker thread. config/asgi.py routes the movies endpoints here (see
+settings.MOVIES_API_ASYNC_VIEWS); under WSGI the sync views are used.
+"""
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+from django.views.generic import View
+from django.views.generic.list import MultipleObjectMixin
+
+from movies.models import FilmWorkRead
+
+from .async_db import fetch_all, fetch_one
+from .cache import film_cache
+from .conditional import (catalog_state_queryset, film_last_modified_queryset,
+                          format_catalog_etag, format_film_etag,
+                          get_not_modified_response, set_validators)
+from .counts import aget_count
+from .renderers import get_renderer
+from .views import MoviesApiMixin, MoviesListMixin, RendererMixin
+
+
+class AsyncMoviesApi(MoviesListMixin, RendererMixin, MultipleObjectMixin, View):
+    """Async MoviesApi: the same modes, parameters and conditional GET handling."""
+
+    async def get(self, request, *args, **kwargs):
+        state = await fetch_one(catalog_state_queryset())
+        etag = format_catalog_etag(state)
+        response = get_not_modified_response(request, etag, None)
+        if response is None:
+            self.object_list = self.get_queryset()
+            response = self.render_to_response(await self._get_context())
+        return set_validators(response, etag, None)
+
+    async def _get_context(self):
+        if 'ids' in self.request.GET:
+            ids, queryset = self._get_batch_queryset()
+            return self._batch_context(ids, await fetch_all(queryset))
+        if 'cursor' in self.request.GET:
+            queryset, page_size = self._get_cursor_queryset()
+            return self._cursor_context(await fetch_all(queryset), page_size)
+
+        queryset = self._get_page_queryset()
+        self._counted = await aget_count(queryset)
+        paginator, page, films, _ = self.paginate_queryset(queryset, self.get_paginate_by(queryset))
+        return self._page_context(paginator, page, await fetch_all(films))
+
+    def get_paginator(self, *args, **kwargs):
+        paginator = super().get_paginator(*args, **kwargs)
+        # Counted asynchronously beforehand, the paginator would run sync queries.
+        paginator.counted = self._counted
+        return paginator
+
+
+class AsyncMoviesDetailApi(MoviesApiMixin, View):
+    """
+    Async MoviesDetailApi. The film's ``updated_at`` is read first and answers
+    the conditional GET; on a film_cache miss, or an entry built from an older
+    ``updated_at``, the film is read in one more query.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        pk = kwargs['pk']
+        last_modified = await fetch_one(film_last_modified_queryset(pk).values('updated_at'))
+        if last_modified is None:
+            raise Http404
+        last_modified = last_modified['updated_at']
+        etag = format_film_etag(pk, last_modified)
+        response = get_not_modified_response(request, etag, last_modified)
+        if response is not None:
+            return set_validators(response, etag, last_modified)
+
+        if film_cache.shared is None:
+            content = film_cache.get(pk, last_modified)
+        else:
+            content = await sync_to_async(film_cache.get, thread_sensitive=False)(pk, last_modified)
+
+        if content is None:
+            generation = film_cache.generation
+            queryset = FilmWorkRead.objects.filter(pk=pk).values(*self.get_fields(), 'updated_at')
+            film = await fetch_one(queryset)
+            if film is None:
+                raise Http404
+            film_updated_at = film.pop('updated_at')
+            content = get_renderer().render(film)
+            if film_cache.shared is None:
+                film_cache.set(pk, content, film_updated_at, generation)
+            else:
+                await sync_to_async(film_cache.set, thread_sensitive=False)(pk, content, film_updated_at, generation)
+
+        response = HttpResponse(content, content_type=get_renderer().content_type)
+        return set_validators(response, etag, last_modified)
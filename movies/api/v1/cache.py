@@ -0,0 +1,235 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+
+class FilmCache:
+    """
+    Cache of serialized film JSON keyed by film id and the ``updated_at`` of
+    the film_work_read row it was built from. The views read ``updated_at``
+    first (see conditional.py), so an entry built before any later write, in
+    this worker or another, or outside the ORM (the ETL, raw SQL), is never
+    served.
+
+    The first level is an LRU inside the worker process, dropped by the model
+    signals (see movies/signals.py) and after ``ttl`` seconds. The optional
+    second level is a Django cache shared by all workers. Its keys include the
+    ``updated_at`` stamp, so a worker that read the film before a write can only
+    store under the old stamp, which no request asks for; such entries expire
+    after ``shared_ttl`` seconds.
+    """
+    key_prefix = 'movies:film:'
+
+    def __init__(self, max_entries: int, ttl: float, backend: str | None = None, shared_ttl: float | None = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.backend = backend
+        self.shared_ttl = shared_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation, so a response built from data read
+        # before the invalidation is not stored afterwards.
+        self.generation = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidation_events = 0
+        self.invalidated_films = 0
+        self.max_fan_out = 0
+
+    @property
+    def shared(self):
+        return caches[self.backend] if self.backend else None
+
+    def _shared_key(self, key: str, last_modified: datetime) -> str:
+        return f'{self.key_prefix}{key}:{last_modified.timestamp()}'
+
+    def get(self, pk, last_modified: datetime) -> bytes | None:
+        """The film's JSON if it was cached for this ``updated_at``."""
+        key = str(pk)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, (content, stamp) = entry
+                if expires_at > time.monotonic() and stamp == last_modified:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return content
+                del self._entries[key]
+            generation = self.generation
+
+        if self.shared is not None:
+            content = self.shared.get(self._shared_key(key, last_modified))
+            if content is not None:
+                with self._lock:
+                    self.shared_hits += 1
+                    if generation == self.generation:
+                        self._store(key, (content, last_modified))
+                return content
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, pk, content: bytes, last_modified: datetime, generation: int) -> None:
+        key = str(pk)
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._store(key, (content, last_modified))
+        if self.shared is not None:
+            self.shared.set(self._shared_key(key, last_modified), content, self.shared_ttl)
+
+    def _store(self, key: str, value: tuple[bytes, datetime]) -> None:
+        # Called with self._lock held.
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, pks) -> None:
+        keys = {str(pk) for pk in pks}
+        with self._lock:
+            self.generation += 1
+            self.invalidation_events += 1
+            self.invalidated_films += len(keys)
+            self.max_fan_out = max(self.max_fan_out, len(keys))
+            for key in keys:
+                self._entries.pop(key, None)
+        logger.debug(f"Invalidated {len(keys)} cached films")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'hit_ratio': (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidation_events': self.invalidation_events,
+                'invalidated_films': self.invalidated_films,
+                'max_fan_out': self.max_fan_out,
+            }
+
+
+class AggregateCache:
+    """
+    A single computed value, such as the genre list with film counts, that is
+    too expensive to aggregate on every request. Same two levels and expiry
+    rules as FilmCache; ``invalidate`` is called from the model signals.
+    """
+
+    def __init__(self, key: str, ttl: float, backend: str | None = None, shared_ttl: float | None = None):
+        self.key = key
+        self.ttl = ttl
+        self.backend = backend
+        self.shared_ttl = shared_ttl
+        self._entry = None
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    @property
+    def shared(self):
+        return caches[self.backend] if self.backend else None
+
+    def get(self, compute):
+        """Returns the cached value, calling ``compute()`` to rebuild it when missing."""
+        with self._lock:
+            if self._entry is not None and self._entry[0] > time.monotonic():
+                return self._entry[1]
+            generation = self.generation
+
+        value = self.shared.get(self.key) if self.shared is not None else None
+        if value is None:
+            value = compute()
+            if self.shared is not None and generation == self.generation:
+                self.shared.set(self.key, value, self.shared_ttl)
+        with self._lock:
+            if generation == self.generation:
+                self._entry = (time.monotonic() + self.ttl, value)
+        return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entry = None
+        if self.shared is not None:
+            self.shared.delete(self.key)
+        logger.debug(f"Invalidated {self.key}")
+
+
+class SearchCache:
+    """
+    Ranked ids returned by the admin autocomplete, keyed by model and search
+    term, so editors typing the same prefix share one search. The entries live
+    inside the worker only and expire after ``ttl`` seconds; saving a person or
+    genre drops the entries of its model in the saving worker.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    def get(self, model: str, term: str) -> list | None:
+        key = (model, term)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, ids = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return ids
+
+    def set(self, model: str, term: str, ids: list, generation: int) -> None:
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[(model, term)] = (time.monotonic() + self.ttl, ids)
+            self._entries.move_to_end((model, term))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, model: str) -> None:
+        with self._lock:
+            self.generation += 1
+            for key in [key for key in self._entries if key[0] == model]:
+                del self._entries[key]
+        logger.debug(f"Invalidated autocomplete results of {model}")
+
+
+film_cache = FilmCache(
+    max_entries=settings.MOVIES_API_CACHE_SIZE,
+    ttl=settings.MOVIES_API_CACHE_TTL,
+    backend=settings.MOVIES_API_CACHE_BACKEND,
+    shared_ttl=settings.MOVIES_API_SHARED_CACHE_TTL,
+)
+
+genre_list_cache = AggregateCache(
+    'movies:genres',
+    ttl=settings.MOVIES_API_GENRES_CACHE_TTL,
+    backend=settings.MOVIES_API_CACHE_BACKEND,
+    shared_ttl=settings.MOVIES_API_SHARED_CACHE_TTL,
+)
+
+autocomplete_cache = SearchCache(
+    max_entries=settings.MOVIES_ADMIN_AUTOCOMPLETE_CACHE_SIZE,
+    ttl=settings.MOVIES_ADMIN_AUTOCOMPLETE_CACHE_TTL,
+)
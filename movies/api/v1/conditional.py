@@ -0,0 +1,87 @@
+"""
+Validators for conditional GET (``django.views.decorators.http.condition``).
+
+A film is validated by its ``film_work_read.updated_at``, which changes
+whenever the film or any of its genres/persons changes. It is read by primary
+key on every request rather than taken from film_cache, whose entries another
+worker's edit does not reach; the cached body is used only when its stamp
+matches. The catalog is
+validated by an ETag only: the trigger-maintained row count and number of
+changes of film_work_read (migration 0012). Its newest ``updated_at`` would
+miss a transaction that commits after a younger one, so it is not used as a
+Last-Modified. They are evaluated before the view body, so a matching
+``If-None-Match``/``If-Modified-Since`` gets a 304 without reading or
+serializing the films. The film lookup is memoized on the request because
+``condition`` asks for the ETag and Last-Modified separately.
+"""
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from movies.models import FilmWorkRead, RowCount
+
+
+def catalog_state_queryset():
+    """
+    One-row ``{'count', 'changes'}`` queryset: the counters of film_work_read.
+    A queryset rather than a model instance so the async views can compile
+    and run it.
+    """
+    return RowCount.objects.filter(table_name='film_work_read').values('count', 'changes')
+
+
+def format_catalog_etag(state):
+    return f"{state['count']}-{state['changes']}"
+
+
+def format_film_etag(pk, last_modified):
+    if last_modified is None:
+        return None
+    return f'{pk}-{last_modified.timestamp()}'
+
+
+def catalog_etag(request, *args, **kwargs):
+    return format_catalog_etag(catalog_state_queryset()[0])
+
+
+def film_last_modified_queryset(pk):
+    return FilmWorkRead.objects.filter(pk=pk).values_list('updated_at', flat=True)
+
+
+def _get_film_last_modified(request, pk):
+    if not hasattr(request, '_film_last_modified'):
+        request._film_last_modified = film_last_modified_queryset(pk).first()
+    return request._film_last_modified
+
+
+def film_etag(request, pk, *args, **kwargs):
+    return format_film_etag(pk, _get_film_last_modified(request, pk))
+
+
+def film_last_modified(request, pk, *args, **kwargs):
+    return _get_film_last_modified(request, pk)
+
+
+def _timestamp(last_modified):
+    return int(last_modified.timestamp()) if last_modified else None
+
+
+def get_not_modified_response(request, etag, last_modified):
+    """
+    What ``condition`` does before calling the view, for views that compute
+    the validators themselves (the async views cannot use the decorator).
+    Returns the 304/412 response or None.
+    """
+    return get_conditional_response(
+        request,
+        etag=quote_etag(etag) if etag else None,
+        last_modified=_timestamp(last_modified),
+    )
+
+
+def set_validators(response, etag, last_modified):
+    """What ``condition`` does after the view: adds ETag and Last-Modified to the response."""
+    if last_modified and not response.has_header('Last-Modified'):
+        response.headers['Last-Modified'] = http_date(_timestamp(last_modified))
+    if etag:
+        response.headers.setdefault('ETag', quote_etag(etag))
+    return response
@@ -0,0 +1,94 @@
+"""
+Row counts for paginated lists without a COUNT(*) over the whole result.
+
+* Unfiltered querysets read the exact count from content.row_count, which
+  triggers keep up to date (migration 0009).
+* Filtered querysets first ask the planner: EXPLAIN scales pg_class.reltuples
+  by the selectivity of the filters. A result estimated at fewer than
+  settings.MOVIES_EXACT_COUNT_THRESHOLD rows is cheap to count exactly, so
+  it is counted. Larger results keep the estimate and are reported as inexact.
+
+Counts are ``(count, exact)`` pairs. The async views get the same decisions
+from ``aget_count``, which runs its queries through async_db.
+"""
+import json
+
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from movies.models import RowCount
+
+from . import async_db
+
+
+def _is_unfiltered(queryset) -> bool:
+    query = queryset.query
+    return not (query.has_filters() or query.distinct or query.is_sliced or query.combinator)
+
+
+def _row_count_queryset(queryset):
+    table_name = queryset.model._meta.db_table.split('"."')[-1]
+    return RowCount.objects.filter(table_name=table_name).values('count')
+
+
+def _explain_sql(queryset) -> tuple[str, tuple]:
+    sql, params = async_db.compile_queryset(queryset.order_by())
+    return f'EXPLAIN (FORMAT JSON) {sql}', params
+
+
+def _plan_rows(plan) -> int:
+    # Django loads json columns as text, the async pool parses them.
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def get_count(queryset) -> tuple[int, bool]:
+    if _is_unfiltered(queryset):
+        row = _row_count_queryset(queryset).first()
+        if row is not None:
+            return row['count'], True
+    try:
+        sql, params = _explain_sql(queryset)
+    except EmptyResultSet:
+        return 0, True
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        estimate = _plan_rows(cursor.fetchone()[0])
+    if estimate < settings.MOVIES_EXACT_COUNT_THRESHOLD:
+        return queryset.count(), True
+    return estimate, False
+
+
+async def aget_count(queryset) -> tuple[int, bool]:
+    if _is_unfiltered(queryset):
+        row = await async_db.fetch_one(_row_count_queryset(queryset))
+        if row is not None:
+            return row['count'], True
+    try:
+        sql, params = _explain_sql(queryset)
+    except EmptyResultSet:
+        return 0, True
+    estimate = _plan_rows(await async_db.fetch_value(sql, params))
+    if estimate < settings.MOVIES_EXACT_COUNT_THRESHOLD:
+        return await async_db.fetch_count(queryset), True
+    return estimate, False
+
+
+class CountingPaginator(Paginator):
+    """Paginator whose ``count`` comes from get_count; ``count_exact`` tells whether it is an estimate."""
+
+    @cached_property
+    def counted(self) -> tuple[int, bool]:
+        return get_count(self.object_list)
+
+    @cached_property
+    def count(self):
+        return self.counted[0]
+
+    @property
+    def count_exact(self) -> bool:
+        return self.counted[1]
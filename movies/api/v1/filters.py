@@ -0,0 +1,73 @@
+import uuid
+from datetime import MAXYEAR, MINYEAR, date
+
+from django.core.exceptions import BadRequest
+from django.db.models import Exists, OuterRef
+
+from movies.models import FilmWork, GenreFilmWork, PersonFilmWork
+
+
+def _parse(params, name, parse, expected):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return parse(value)
+    except ValueError:
+        raise BadRequest(f"Invalid {name} '{value}', expected {expected}")
+
+
+def _year(value):
+    year = int(value)
+    # year_to is turned into the first day of the next year, so MAXYEAR itself is out.
+    if not MINYEAR <= year < MAXYEAR:
+        raise ValueError(value)
+    return year
+
+
+def _parse_choice(params, name, choices):
+    value = params.get(name)
+    if value and value not in choices:
+        raise BadRequest(f"Invalid {name} '{value}', expected one of: {', '.join(choices)}")
+    return value or None
+
+
+def filter_films(queryset, params):
+    """
+    Applies the list filters from the query string to a film_work_read queryset.
+
+    Genre and person filters are EXISTS subqueries on the junction tables, so
+    they use the (genre_id) and (person_id, role) indexes and never widen the
+    scanned rows; year and rating filters use the (creation_date, rating) index.
+    """
+    if film_type := _parse_choice(params, 'type', FilmWork.FilmWorkType.values):
+        queryset = queryset.filter(type=film_type)
+
+    if genre := _parse(params, 'genre', uuid.UUID, 'a UUID'):
+        queryset = queryset.filter(Exists(
+            GenreFilmWork.objects.filter(film_work_id=OuterRef('id'), genre_id=genre)
+        ))
+
+    person = _parse(params, 'person', uuid.UUID, 'a UUID')
+    role = _parse_choice(params, 'role', PersonFilmWork.PersonRole.values)
+    if person or role:
+        credits = PersonFilmWork.objects.filter(film_work_id=OuterRef('id'))
+        if person:
+            credits = credits.filter(person_id=person)
+        if role:
+            credits = credits.filter(role=role)
+        queryset = queryset.filter(Exists(credits))
+
+    if (rating_min := _parse(params, 'rating_min', float, 'a number')) is not None:
+        queryset = queryset.filter(rating__gte=rating_min)
+    if (rating_max := _parse(params, 'rating_max', float, 'a number')) is not None:
+        queryset = queryset.filter(rating__lte=rating_max)
+
+    # Years are turned into date ranges, a year() expression could not use the index.
+    expected_year = f'a year from {MINYEAR} to {MAXYEAR - 1}'
+    if (year_from := _parse(params, 'year_from', _year, expected_year)) is not None:
+        queryset = queryset.filter(creation_date__gte=date(year_from, 1, 1))
+    if (year_to := _parse(params, 'year_to', _year, expected_year)) is not None:
+        queryset = queryset.filter(creation_date__lt=date(year_to + 1, 1, 1))
+
+    return queryset
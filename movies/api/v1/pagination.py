@@ -0,0 +1,98 @@
+import base64
+import json
+import uuid
+from datetime import datetime, timezone
+
+from django.core.exceptions import BadRequest
+from django.db.models import DateTimeField, F, FloatField, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils.dateparse import parse_datetime
+
+# Sort keys are wrapped in COALESCE so that NULL ratings/timestamps sort as the
+# lowest value and a single expression index can serve both directions.
+# The expressions must stay in sync with the indexes from migration 0005.
+NULL_RATING = -1.0
+NULL_MODIFIED = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+SORT_KEYS = {
+    'modified': Coalesce(F('modified'), Value(NULL_MODIFIED, output_field=DateTimeField())),
+    'rating': Coalesce(F('rating'), Value(NULL_RATING, output_field=FloatField())),
+}
+ORDERINGS = tuple(
+    prefix + key for key in SORT_KEYS for prefix in ('', '-')
+)
+SORT_KEY_ALIAS = 'sort_key'
+
+
+def parse_ordering(ordering: str) -> tuple[str, bool]:
+    """Splits an ``ordering`` query parameter into (sort key, descending)."""
+    if ordering not in ORDERINGS:
+        raise BadRequest(f"Unknown ordering '{ordering}', expected one of: {', '.join(ORDERINGS)}")
+    return ordering.lstrip('-'), ordering.startswith('-')
+
+
+def order_queryset(queryset, ordering: str):
+    """Annotates the sort key and orders by (sort key, id) in the given direction."""
+    key, descending = parse_ordering(ordering)
+    queryset = queryset.annotate(**{SORT_KEY_ALIAS: SORT_KEYS[key]})
+    if descending:
+        return queryset.order_by(F(SORT_KEY_ALIAS).desc(), F('id').desc())
+    return queryset.order_by(F(SORT_KEY_ALIAS).asc(), F('id').asc())
+
+
+def keyset_filter(queryset, ordering: str, cursor: str):
+    """
+    Restricts an ordered queryset to the rows strictly after the cursor position.
+
+    The condition is written as ``key <= v AND (key < v OR id < pk)`` rather than
+    a plain OR, so that Postgres can use the leading part as an index range.
+    """
+    _, descending = parse_ordering(ordering)
+    value, pk = decode_cursor(cursor, ordering)
+    if descending:
+        return queryset.filter(
+            Q(**{f'{SORT_KEY_ALIAS}__lte': value}),
+            Q(**{f'{SORT_KEY_ALIAS}__lt': value}) | Q(id__lt=pk),
+        )
+    return queryset.filter(
+        Q(**{f'{SORT_KEY_ALIAS}__gte': value}),
+        Q(**{f'{SORT_KEY_ALIAS}__gt': value}) | Q(id__gt=pk),
+    )
+
+
+def encode_cursor(ordering: str, value, pk) -> str:
+    """Builds an opaque cursor pointing at the row with the given sort key and id."""
+    parse_ordering(ordering)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return dump_token([ordering, value, str(pk)])
+
+
+def decode_cursor(cursor: str, ordering: str):
+    """Returns (sort key value, id) from a cursor, validating it against the ordering."""
+    try:
+        cursor_ordering, value, pk = load_token(cursor)
+        pk = uuid.UUID(pk)
+    except (ValueError, TypeError, AttributeError):
+        raise BadRequest('Malformed cursor')
+    if cursor_ordering != ordering:
+        raise BadRequest('Cursor was issued for a different ordering')
+    key, _ = parse_ordering(ordering)
+    if key == 'modified':
+        value = parse_datetime(value) if isinstance(value, str) else None
+    elif not isinstance(value, (int, float)):
+        value = None
+    if value is None:
+        raise BadRequest('Malformed cursor')
+    return value, pk
+
+
+def dump_token(payload) -> str:
+    """Packs a JSON-serializable payload into an opaque URL-safe token."""
+    data = json.dumps(payload, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def load_token(token: str):
+    """Reverse of dump_token; raises ValueError for anything that is not a valid token."""
+    return json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
@@ -0,0 +1,51 @@
+"""
+JSON renderers for the API views.
+
+The renderer is chosen with settings.MOVIES_API_JSON_RENDERER. OrjsonRenderer
+serializes ``values()`` rows straight to bytes and handles UUID/date/datetime
+natively; when orjson is not installed it falls back to DjangoJsonRenderer,
+which produces the same output as ``JsonResponse``.
+"""
+import functools
+import json
+import logging
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+class DjangoJsonRenderer:
+    content_type = 'application/json'
+
+    def render(self, data) -> bytes:
+        return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+
+class OrjsonRenderer:
+    content_type = 'application/json'
+
+    @staticmethod
+    def _default(value):
+        # orjson covers UUID, date and datetime itself; the rest (Decimal, lazy
+        # translation strings, ...) goes through Django's encoder.
+        return DjangoJSONEncoder().default(value)
+
+    def render(self, data) -> bytes:
+        return orjson.dumps(data, default=self._default, option=orjson.OPT_NON_STR_KEYS)
+
+
+@functools.lru_cache(maxsize=None)
+def get_renderer():
+    renderer_class = import_string(settings.MOVIES_API_JSON_RENDERER)
+    if renderer_class is OrjsonRenderer and orjson is None:
+        logger.warning("orjson is not installed, falling back to DjangoJsonRenderer")
+        renderer_class = DjangoJsonRenderer
+    return renderer_class()
@@ -0,0 +1,134 @@
+"""
+Full-text search over the ``movies`` Elasticsearch index.
+
+The index is built by sqlite_to_postgres.es_loader.ElasticsearchLoader; this
+module only reads it, so search requests never reach Postgres.
+"""
+import functools
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import BadRequest
+from elasticsearch import Elasticsearch
+
+from .pagination import dump_token, load_token
+
+SEARCH_FIELDS = ('title^3', 'description', 'actors_names', 'directors_names', 'writers_names')
+SORTS = {
+    'imdb_rating': {'imdb_rating': 'asc'},
+    '-imdb_rating': {'imdb_rating': 'desc'},
+    'title': {'title.raw': 'asc'},
+    '-title': {'title.raw': 'desc'},
+}
+PERSON_ROLES = ('actors', 'directors', 'writers')
+SOURCE_FIELDS = ('id', 'title', 'description', 'imdb_rating', 'type', 'genres', *PERSON_ROLES)
+
+
+@functools.lru_cache(maxsize=None)
+def get_client() -> Elasticsearch:
+    return Elasticsearch(**settings.ELASTICSEARCH_DSL['default'])
+
+
+def _parse_float(params, name):
+    # Empty values are ignored, as in the list filters.
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise BadRequest(f"Invalid {name} '{value}', expected a number")
+
+
+def _parse_uuid(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return str(uuid.UUID(value))
+    except ValueError:
+        raise BadRequest(f"Invalid {name} '{value}', expected a UUID")
+
+
+def build_query(params) -> dict:
+    """Translates the request query parameters into an Elasticsearch bool query."""
+    must = []
+    filters = []
+
+    query = params.get('query')
+    if query:
+        must.append({'multi_match': {'query': query, 'fields': list(SEARCH_FIELDS), 'operator': 'and'}})
+
+    # genre is an id, as on the film list; genre_name matches the name.
+    if genre := _parse_uuid(params, 'genre'):
+        filters.append({'term': {'genre_ids': genre}})
+    if genre_name := params.get('genre_name'):
+        filters.append({'term': {'genres': genre_name}})
+    if film_type := params.get('type'):
+        filters.append({'term': {'type': film_type}})
+    if person := _parse_uuid(params, 'person'):
+        filters.append({'bool': {'should': [
+            {'nested': {'path': role, 'query': {'term': {f'{role}.id': person}}}}
+            for role in PERSON_ROLES
+        ]}})
+
+    rating_range = {}
+    if (rating_min := _parse_float(params, 'rating_min')) is not None:
+        rating_range['gte'] = rating_min
+    if (rating_max := _parse_float(params, 'rating_max')) is not None:
+        rating_range['lte'] = rating_max
+    if rating_range:
+        filters.append({'range': {'imdb_rating': rating_range}})
+
+    return {'bool': {'must': must or [{'match_all': {}}], 'filter': filters}}
+
+
+def build_sort(params) -> list:
+    """Relevance first for text queries, rating otherwise; id breaks ties for search_after."""
+    sort = params.get('sort')
+    if sort is None:
+        sort = '_score' if params.get('query') else '-imdb_rating'
+    if sort == '_score':
+        return ['_score', {'id': 'asc'}]
+    if sort not in SORTS:
+        raise BadRequest(f"Unknown sort '{sort}', expected one of: _score, {', '.join(SORTS)}")
+    return [SORTS[sort], {'id': 'asc'}]
+
+
+def _to_movie(source: dict) -> dict:
+    return {
+        'id': source['id'],
+        'title': source.get('title'),
+        'description': source.get('description'),
+        'rating': source.get('imdb_rating'),
+        'type': source.get('type'),
+        'genres': source.get('genres', []),
+        **{role: [person['name'] for person in source.get(role, [])] for role in PERSON_ROLES},
+    }
+
+
+def search_movies(params, page_size: int) -> dict:
+    """Runs one page of the search; ``cursor`` carries the search_after values of the previous page."""
+    body = {
+        'query': build_query(params),
+        'sort': build_sort(params),
+        'size': page_size,
+        '_source': list(SOURCE_FIELDS),
+        'track_total_hits': False,
+    }
+    if cursor := params.get('cursor'):
+        try:
+            search_after = load_token(cursor)
+        except ValueError:
+            search_after = None
+        if not isinstance(search_after, list):
+            raise BadRequest('Malformed cursor')
+        body['search_after'] = search_after
+
+    response = get_client().search(index=settings.ES_INDEX_MOVIES, **body)
+    hits = response['hits']['hits']
+    next_cursor = dump_token(hits[-1]['sort']) if len(hits) == page_size else None
+    return {
+        'next_cursor': next_cursor,
+        'results': [_to_movie(hit['_source']) for hit in hits],
+    }
@@ -1,7 +1,25 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+if settings.MOVIES_API_ASYNC_VIEWS:
+    from . import async_views
+    movies_list_view = async_views.AsyncMoviesApi.as_view()
+    movies_detail_view = async_views.AsyncMoviesDetailApi.as_view()
+else:
+    movies_list_view = views.MoviesApi.as_view()
+    movies_detail_view = views.MoviesDetailApi.as_view()
+
 urlpatterns = [
-    path('movies/', views.MoviesApi.as_view()),
-    path('movies/<uuid:pk>/', views.MoviesDetailApi.as_view()),
+    path('movies/', movies_list_view),
+    path('movies/export/', views.MoviesExportApi.as_view()),
+    path('movies/search/', views.MoviesSearchApi.as_view()),
+    path('movies/<uuid:pk>/', movies_detail_view),
+    path('genres/', views.GenresApi.as_view()),
+    path('genres/<uuid:pk>/films/', views.GenreFilmsApi.as_view()),
+    path('persons/', views.PersonsApi.as_view()),
+    path('persons/<uuid:pk>/', views.PersonsDetailApi.as_view()),
+    path('internal/cache/', views.CacheStatsApi.as_view()),
+    path('internal/db-pool/', views.DatabasePoolStatsApi.as_view()),
+    path('internal/metrics/', views.MetricsApi.as_view()),
 ]
\ No newline at end of file
@@ -1,57 +1,479 @@
-from django.contrib.postgres.aggregates import ArrayAgg
-from django.db.models import Q
-from django.http import JsonResponse
+import logging
+import re
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import BadRequest, PermissionDenied
+from django.db import connection, transaction
+from django.db.models import BooleanField, Count
+from django.db.models.expressions import RawSQL
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.decorators import method_decorator
+from django.views import defaults
+from django.views.decorators.http import condition
+from django.views.generic import View
 from django.views.generic.detail import BaseDetailView
 from django.views.generic.list import BaseListView
+from elasticsearch import ApiError, BadRequestError, TransportError
+
+from config.backends.postgresql_pool.base import pool_stats
+from movies.metrics import render_prometheus
+from movies.models import FilmWorkRead, Genre, Person, PersonFilmWork
+
+from . import async_db
+from .cache import film_cache, genre_list_cache
+from .conditional import catalog_etag, film_etag, film_last_modified
+from .counts import CountingPaginator
+from .filters import filter_films
+from .pagination import (SORT_KEY_ALIAS, encode_cursor, keyset_filter,
+                         order_queryset)
+from .renderers import get_renderer
+from .search import search_movies
+
+logger = logging.getLogger(__name__)
+
+# pg_snapshot text: xmin:xmax:the transactions in progress, comma-separated.
+SNAPSHOT_RE = re.compile(r'(\d{1,19}):(\d{1,19}):((?:\d{1,19},)*\d{1,19})?')
+MAX_XID8 = 2 ** 63 - 1
+
 
-from movies.models import FilmWork
+def json_error(message: str, status: int) -> JsonResponse:
+    """The error body of every API endpoint."""
+    return JsonResponse({'error': message}, status=status)
+
+
+def bad_request(request, exception):
+    """
+    handler400: the BadRequest raised by the API views and their parameter
+    parsers becomes a JSON error with its message; other pages keep Django's.
+    """
+    if request.path.startswith('/api/'):
+        return json_error(str(exception) if isinstance(exception, BadRequest) else 'Bad request', 400)
+    return defaults.bad_request(request, exception)
 
 
 class MoviesApiMixin:
-    model = FilmWork
+    model = FilmWorkRead
     http_method_names = ['get']
+    fields = ('id', 'title', 'description', 'creation_date', 'rating', 'type')
+    relations = ('genres', 'actors', 'directors', 'writers')
 
-    def _get_annotated_queryset(self):
-        return FilmWork.objects.prefetch_related('genres', 'persons').annotate(
-            genres=ArrayAgg('genres__name', distinct=True),
-            actors=ArrayAgg(
-                'persons__full_name',
-                distinct=True,
-                filter=Q(personfilmwork__role='actor')
-            ),
-            directors=ArrayAgg(
-                'persons__full_name',
-                distinct=True,
-                filter=Q(personfilmwork__role='director')
-            ),
-            writers=ArrayAgg(
-                'persons__full_name',
-                distinct=True,
-                filter=Q(personfilmwork__role='writer')
-            ),
-        ).values(
-            'id', 'title', 'description', 'creation_date', 'rating', 'type',
-            'genres', 'actors', 'directors', 'writers'
-        )
+    def get_fields(self):
+        return (*self.fields, *self.relations)
+
+    def _get_films_queryset(self, queryset=None):
+        if queryset is None:
+            queryset = FilmWorkRead.objects.all()
+        return queryset.values(*self.get_fields())
+
+
+class SparseFieldsMixin:
+    """
+    Lets the client pick the columns: ``?fields=`` lists the plain fields and
+    ``?include=`` the aggregated relations, both comma-separated; an empty value
+    selects none. Only the requested columns are read, so lean responses skip
+    the (TOASTed) name arrays entirely. ``id`` is always returned.
+    """
+
+    def _get_list_param(self, name, allowed):
+        if name not in self.request.GET:
+            return allowed
+        values = [value for value in self.request.GET[name].split(',') if value]
+        unknown = set(values) - set(allowed)
+        if unknown:
+            raise BadRequest(f"Unknown {name}: {', '.join(sorted(unknown))}; expected some of: {', '.join(allowed)}")
+        return tuple(value for value in allowed if value in values)
+
+    def get_fields(self):
+        fields = self._get_list_param('fields', self.fields)
+        relations = self._get_list_param('include', self.relations)
+        return ('id', *(field for field in fields if field != 'id'), *relations)
+
+
+class RendererMixin:
+    """Serializes the context with the configured JSON renderer."""
 
     def render_to_response(self, context, **response_kwargs):
-        return JsonResponse(context)
+        renderer = get_renderer()
+        return HttpResponse(renderer.render(context), content_type=renderer.content_type, **response_kwargs)
+
 
+class MoviesListMixin(SparseFieldsMixin, MoviesApiMixin):
+    """
+    Film list queries and response layout, shared by MoviesApi and its async
+    twin (async_views.AsyncMoviesApi). The ``_get_*_queryset`` methods only
+    build querysets, the ``_*_context`` methods shape the fetched rows.
+    """
+    paginate_by = settings.MOVIES_API_PAGE_SIZE
+    paginator_class = CountingPaginator
+    max_batch_size = settings.MOVIES_API_BATCH_MAX_SIZE
+    default_ordering = '-modified'
 
-class MoviesApi(MoviesApiMixin, BaseListView):
+    def get_ordering(self):
+        return self.request.GET.get('ordering', self.default_ordering)
 
     def get_queryset(self):
-        return self._get_annotated_queryset()
+        queryset = filter_films(FilmWorkRead.objects.all(), self.request.GET)
+        return order_queryset(queryset, self.get_ordering())
+
+    def _get_page_queryset(self):
+        return self._get_films_queryset(self.object_list)
+
+    def _page_context(self, paginator, page, films):
+        return {
+            'count': paginator.count,
+            'count_exact': paginator.count_exact,
+            'total_pages': paginator.num_pages,
+            'prev': page.previous_page_number() if page.has_previous() else None,
+            'next': page.next_page_number() if page.has_next() else None,
+            'results': list(films),
+        }
+
+    def _get_cursor_queryset(self):
+        """Returns the queryset of the page plus one row (to detect the next page) and the page size."""
+        cursor = self.request.GET['cursor']
+        queryset = self.object_list
+        if cursor:
+            queryset = keyset_filter(queryset, self.get_ordering(), cursor)
+
+        page_size = self.get_paginate_by(queryset)
+        return queryset.values(*self.get_fields(), SORT_KEY_ALIAS)[:page_size + 1], page_size
+
+    def _cursor_context(self, films, page_size):
+        films = list(films)
+        next_cursor = None
+        if len(films) > page_size:
+            films = films[:page_size]
+            next_cursor = encode_cursor(self.get_ordering(), films[-1][SORT_KEY_ALIAS], films[-1]['id'])
+        for film in films:
+            del film[SORT_KEY_ALIAS]
+        return {
+            'next_cursor': next_cursor,
+            'results': films,
+        }
+
+    def _get_ids(self):
+        ids = []
+        for value in self.request.GET['ids'].split(','):
+            if not value:
+                continue
+            try:
+                ids.append(uuid.UUID(value))
+            except ValueError:
+                raise BadRequest(f"Invalid id '{value}', expected a UUID")
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            raise BadRequest('ids must list at least one film id')
+        if len(ids) > self.max_batch_size:
+            raise BadRequest(f'Too many ids: {len(ids)}, at most {self.max_batch_size} are allowed per request')
+        return ids
+
+    def _get_batch_queryset(self):
+        ids = self._get_ids()
+        return ids, self._get_films_queryset(FilmWorkRead.objects.filter(id__in=ids))
+
+    def _batch_context(self, ids, films):
+        films = {film['id']: film for film in films}
+        return {
+            'results': [films[pk] for pk in ids if pk in films],
+            'not_found': [pk for pk in ids if pk not in films],
+        }
+
+
+@method_decorator(condition(etag_func=catalog_etag), name='dispatch')
+class MoviesApi(MoviesListMixin, RendererMixin, BaseListView):
+    """
+    Paginated film list.
+
+    Three modes are supported:
+    * ``?page=N`` - numbered pages with ``count``/``total_pages``/``prev``/``next``;
+    * ``?cursor=`` - keyset pagination, each response carries ``next_cursor``;
+    * ``?ids=`` - the listed films (comma-separated ids) in the requested order,
+      read by primary key in a single query; unknown ids go to ``not_found``.
+    The first two read ``film_work_read`` in (sort key, id) index order.
+    """
 
     def get_context_data(self, *, object_list=None, **kwargs):
-        queryset = self.get_queryset()
-        return {'results': list(queryset)}
+        if 'ids' in self.request.GET:
+            return self._batch_context(*self._get_batch_queryset())
+        if 'cursor' in self.request.GET:
+            return self._cursor_context(*self._get_cursor_queryset())
+
+        queryset = self._get_page_queryset()
+        paginator, page, films, _ = self.paginate_queryset(queryset, self.get_paginate_by(queryset))
+        return self._page_context(paginator, page, films)
 
 
+@method_decorator(condition(etag_func=film_etag, last_modified_func=film_last_modified), name='dispatch')
 class MoviesDetailApi(MoviesApiMixin, BaseDetailView):
+    """
+    Single film; the serialized JSON is served from film_cache when the entry
+    was built from the film's current ``updated_at``.
+    """
+
+    def get(self, request, *args, **kwargs):
+        # Looked up by the conditional GET validators already.
+        last_modified = film_last_modified(request, kwargs['pk'])
+        if last_modified is None:
+            raise Http404
+        content = film_cache.get(kwargs['pk'], last_modified)
+
+        if content is None:
+            generation = film_cache.generation
+            self.object = self.get_object()
+            last_modified = self.object.pop('updated_at')
+            context = self.get_context_data(object=self.object)
+            content = get_renderer().render(context)
+            film_cache.set(kwargs['pk'], content, last_modified, generation)
+        return HttpResponse(content, content_type=get_renderer().content_type)
+
     def get_queryset(self):
         queryset = super().get_queryset()
-        return self._get_annotated_queryset(queryset)
+        return queryset.values(*self.get_fields(), 'updated_at')
 
     def get_context_data(self, **kwargs):
-        return kwargs['object']
\ No newline at end of file
+        return kwargs['object']
+
+
+class GenreFilmsApi(MoviesApi):
+    """Films of one genre; same modes and parameters as MoviesApi, ``genre`` comes from the URL."""
+
+    def get(self, request, *args, **kwargs):
+        if not Genre.objects.filter(pk=kwargs['pk']).exists():
+            raise Http404
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        params = self.request.GET.copy()
+        params['genre'] = str(self.kwargs['pk'])
+        queryset = filter_films(FilmWorkRead.objects.all(), params)
+        return order_queryset(queryset, self.get_ordering())
+
+
+def _parse_snapshot(value: str) -> str:
+    """Checks a ``since_snapshot`` value the way pg_snapshot input does, so a bad one is a 400."""
+    match = SNAPSHOT_RE.fullmatch(value)
+    if match is not None:
+        xmin, xmax = int(match[1]), int(match[2])
+        xip = [int(xid) for xid in match[3].split(',')] if match[3] else []
+        if 0 < xmin <= xmax <= MAX_XID8 and all(xmin <= xid < xmax for xid in xip) and xip == sorted(xip):
+            return value
+    raise BadRequest(f"Invalid since_snapshot '{value}', expected the X-Export-Snapshot of an earlier export")
+
+
+class MoviesExportApi(SparseFieldsMixin, MoviesApiMixin, View):
+    """
+    Streams the whole catalog as NDJSON, one film per line.
+
+    Rows are read through a server-side cursor in chunks, so worker memory does
+    not depend on the catalog size.
+
+    The ``X-Export-Snapshot`` header holds the Postgres snapshot taken before
+    the export. Passed back as ``?since_snapshot=``, it limits the next export
+    to films refreshed by transactions that snapshot did not see (migration
+    0013), including those that were still running. Films committed in between
+    may come in both exports; a line is the whole film, so applying it twice is
+    harmless. ``?modified_since=<ISO 8601>`` filters by ``updated_at`` instead,
+    which can miss films written by a transaction that was running at that
+    moment; ``X-Export-Started-At`` is only informational.
+    """
+    chunk_size = settings.MOVIES_API_EXPORT_CHUNK_SIZE
+
+    def get(self, request, *args, **kwargs):
+        started_at = timezone.now()
+        queryset = FilmWorkRead.objects.all()
+        modified_since = request.GET.get('modified_since')
+        if modified_since is not None:
+            since = parse_datetime(modified_since)
+            if since is None:
+                raise BadRequest(f"Invalid modified_since '{modified_since}', expected an ISO 8601 datetime")
+            queryset = queryset.filter(updated_at__gt=since)
+        since_snapshot = request.GET.get('since_snapshot')
+        if since_snapshot is not None:
+            queryset = queryset.filter(self._not_visible_in(_parse_snapshot(since_snapshot)))
+
+        # Taken before the stream's own snapshot, so whatever the stream misses
+        # is not visible in it either and comes with the next export.
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_current_snapshot()::text')
+            snapshot = cursor.fetchone()[0]
+
+        # Under ASGI Django would read a sync iterator into memory before sending it.
+        stream = self._astream if settings.MOVIES_API_ASYNC_VIEWS else self._stream
+        response = StreamingHttpResponse(
+            stream(self._get_films_queryset(queryset)),
+            content_type='application/x-ndjson',
+        )
+        response['X-Export-Snapshot'] = snapshot
+        response['X-Export-Started-At'] = started_at.isoformat()
+        return response
+
+    @staticmethod
+    def _not_visible_in(snapshot: str):
+        # The xmin bound lets Postgres read the candidates from the updated_xid index.
+        return RawSQL(
+            'updated_xid >= pg_snapshot_xmin(%s::pg_snapshot)'
+            ' AND NOT pg_visible_in_snapshot(updated_xid, %s::pg_snapshot)',
+            (snapshot, snapshot),
+            output_field=BooleanField(),
+        )
+
+    def _stream(self, queryset):
+        # Inside a transaction the cursor is declared without HOLD, so Postgres
+        # does not materialize the whole result before the first chunk.
+        renderer = get_renderer()
+        with transaction.atomic():
+            for row in queryset.iterator(chunk_size=self.chunk_size):
+                yield renderer.render(row) + b'\n'
+
+    async def _astream(self, queryset):
+        renderer = get_renderer()
+        async for row in async_db.stream(queryset, self.chunk_size):
+            yield renderer.render(row) + b'\n'
+
+
+class MoviesSearchApi(View):
+    """
+    Full-text search and filtering over the Elasticsearch ``movies`` index.
+
+    ``?query=`` matches title, description and person names; ``genre`` (an id,
+    as on the film list), ``genre_name``, ``person``, ``type``,
+    ``rating_min``/``rating_max`` filter the hits and
+    ``sort`` orders them. Pages are chained with ``search_after`` through the
+    opaque ``cursor``/``next_cursor`` pair.
+    """
+    http_method_names = ['get']
+    page_size = settings.MOVIES_API_PAGE_SIZE
+
+    def get(self, request, *args, **kwargs):
+        try:
+            renderer = get_renderer()
+            return HttpResponse(renderer.render(search_movies(request.GET, self.page_size)),
+                                content_type=renderer.content_type)
+        except BadRequestError as e:
+            return json_error(f'Search request rejected: {e.message}', 400)
+        except (ApiError, TransportError) as e:
+            logger.error(f"Elasticsearch search failed: {e}")
+            return json_error('Search is temporarily unavailable', 503)
+
+
+class GenresApi(RendererMixin, View):
+    """
+    All genres with the number of films in each. The GROUP BY over
+    genre_film_work is cached in genre_list_cache and rebuilt after the
+    genre signals invalidate it.
+    """
+    http_method_names = ['get']
+
+    def get(self, request, *args, **kwargs):
+        return self.render_to_response({'results': genre_list_cache.get(self._get_genres)})
+
+    @staticmethod
+    def _get_genres():
+        return list(
+            Genre.objects
+            .annotate(film_count=Count('genrefilmwork'))
+            .order_by('name', 'id')
+            .values('id', 'name', 'description', 'film_count')
+        )
+
+
+class PersonsApiMixin:
+    model = Person
+    http_method_names = ['get']
+    fields = ('id', 'full_name')
+    film_fields = ('id', 'title', 'creation_date', 'rating', 'type')
+
+    def _get_filmographies(self, person_ids):
+        """
+        Films of the given persons grouped by role, read in one query over
+        person_film_work (served by its (person_id, role, film_work_id) index).
+        """
+        filmographies = {
+            person_id: {role: [] for role in PersonFilmWork.PersonRole.values}
+            for person_id in person_ids
+        }
+        credits = (
+            PersonFilmWork.objects
+            .filter(person_id__in=person_ids)
+            .order_by('person_id', 'role', '-film_work__creation_date', 'film_work__title')
+            .values('person_id', 'role', *(f'film_work__{field}' for field in self.film_fields))
+        )
+        for credit in credits:
+            filmographies[credit['person_id']][credit['role']].append(
+                {field: credit[f'film_work__{field}'] for field in self.film_fields}
+            )
+        return filmographies
+
+    def _with_filmographies(self, persons):
+        persons = list(persons)
+        filmographies = self._get_filmographies([person['id'] for person in persons])
+        for person in persons:
+            person['films'] = filmographies[person['id']]
+        return persons
+
+
+class PersonsApi(PersonsApiMixin, RendererMixin, BaseListView):
+    """Paginated persons, ``?query=`` matches the full name; each comes with its filmography."""
+    paginate_by = settings.MOVIES_API_PAGE_SIZE
+    paginator_class = CountingPaginator
+
+    def get_queryset(self):
+        queryset = Person.objects.all()
+        if query := self.request.GET.get('query'):
+            queryset = queryset.filter(full_name__icontains=query)
+        return queryset.order_by('full_name', 'id').values(*self.fields)
+
+    def get_context_data(self, *, object_list=None, **kwargs):
+        paginator, page, persons, _ = self.paginate_queryset(self.object_list, self.get_paginate_by(self.object_list))
+        return {
+            'count': paginator.count,
+            'count_exact': paginator.count_exact,
+            'total_pages': paginator.num_pages,
+            'prev': page.previous_page_number() if page.has_previous() else None,
+            'next': page.next_page_number() if page.has_next() else None,
+            'results': self._with_filmographies(persons),
+        }
+
+
+class PersonsDetailApi(PersonsApiMixin, RendererMixin, BaseDetailView):
+
+    def get_queryset(self):
+        return super().get_queryset().values(*self.fields)
+
+    def get_context_data(self, **kwargs):
+        return self._with_filmographies([kwargs['object']])[0]
+
+
+class InternalApiMixin:
+    """Restricts a view to the addresses listed in settings.INTERNAL_API_ALLOWED_IPS."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.META.get('REMOTE_ADDR') not in settings.INTERNAL_API_ALLOWED_IPS:
+            raise PermissionDenied
+        return super().dispatch(request, *args, **kwargs)
+
+
+class CacheStatsApi(InternalApiMixin, View):
+    http_method_names = ['get']
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(film_cache.stats())
+
+
+class DatabasePoolStatsApi(InternalApiMixin, View):
+    """Connection pools of this worker: size, waiting requests, checkout latency."""
+    http_method_names = ['get']
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({'pools': pool_stats(), 'async_pool': async_db.pool_stats()})
+
+
+class MetricsApi(InternalApiMixin, View):
+    """Request and SQL metrics of this worker in the Prometheus text format."""
+    http_method_names = ['get']
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -5,3 +5,6 @@ class MoviesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     verbose_name = _('Фильмы')
     name = 'movies'
+
+    def ready(self):
+        from . import signals  # noqa: F401
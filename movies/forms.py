@@ -0,0 +1,13 @@
+from django import forms
+from django.utils.translation import gettext_lazy as _
+
+from .bulk import FORMATS
+
+
+class CatalogImportForm(forms.Form):
+    file = forms.FileField(label=_('File'))
+    file_format = forms.ChoiceField(
+        label=_('Format'),
+        choices=[(file_format, file_format.upper()) for file_format in FORMATS],
+        initial=FORMATS[0],
+    )
@@ -0,0 +1,151 @@
+"""
+In-process request metrics exported in the Prometheus text format.
+
+Filled by movies.middleware.MetricsMiddleware and served by
+/api/v1/internal/metrics/. Every worker process keeps its own registry, so
+each scrape sees one worker; the ``worker`` label tells them apart.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _format_labels(labelnames, labels):
+    pairs = [
+        (name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in zip(labelnames, labels)
+    ]
+    return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = ('worker', *labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        labels = (WORKER, *labels)
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield self.name, _format_labels(self.labelnames, labels), value
+
+
+class Histogram:
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, buckets: tuple, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = ('worker', *labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float) -> None:
+        labels = (WORKER, *labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(labels, ([0] * (len(self.buckets) + 1), 0))
+            counts[index] += 1
+            self._values[labels] = (counts, total + value)
+
+    def samples(self):
+        with self._lock:
+            values = {labels: (list(counts), total) for labels, (counts, total) in self._values.items()}
+        for labels, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                bucket_labels = _format_labels((*self.labelnames, 'le'), (*labels, bound))
+                yield f'{self.name}_bucket', bucket_labels, cumulative
+            yield f'{self.name}_sum', _format_labels(self.labelnames, labels), total
+            yield f'{self.name}_count', _format_labels(self.labelnames, labels), cumulative
+
+
+WORKER = str(os.getpid())
+
+REQUESTS = Counter(
+    'movies_http_requests_total', 'Requests by route, method and status.', ('route', 'method', 'status'),
+)
+REQUEST_DURATION = Histogram(
+    'movies_http_request_duration_seconds', 'Time spent in the Django handler.', LATENCY_BUCKETS, ('route', 'method'),
+)
+SQL_QUERIES = Histogram(
+    'movies_sql_queries_per_request', 'SQL queries run by one request.', QUERY_COUNT_BUCKETS, ('route',),
+)
+SQL_DURATION = Histogram(
+    'movies_sql_duration_seconds', 'Total SQL time of one request.', LATENCY_BUCKETS, ('route',),
+)
+RESPONSE_SIZE = Histogram(
+    'movies_http_response_size_bytes', 'Body size of responses.', SIZE_BUCKETS, ('route',),
+)
+QUERY_BUDGET_EXCEEDED = Counter(
+    'movies_query_budget_exceeded_total', 'Requests that ran more SQL queries than allowed.', ('route',),
+)
+REGISTRY = (REQUESTS, REQUEST_DURATION, SQL_QUERIES, SQL_DURATION, RESPONSE_SIZE, QUERY_BUDGET_EXCEEDED)
+
+
+class QueryStats:
+    """SQL queries of the current request, set as ``current_query_stats`` by the middleware."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def record(self, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+
+
+current_query_stats = ContextVar('current_query_stats', default=None)
+
+
+def record_query(duration: float) -> None:
+    """For queries that bypass the Django connection (async_db)."""
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(duration)
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    """
+    Installed on every Django connection (movies/signals.py). The context
+    variable follows the request into sync_to_async threads, so this counts the
+    queries of sync views under ASGI as well.
+    """
+    if current_query_stats.get() is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        record_query(time.perf_counter() - started)
+
+
+def render_prometheus() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.type}')
+        lines.extend(f'{name}{labels} {_format_value(value)}' for name, labels, value in metric.samples())
+    return '\n'.join(lines) + '\n'
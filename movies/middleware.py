@@ -0,0 +1,117 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsMiddleware:
+    """
+    Records latency, SQL query count and time, and response size per route
+    (see movies/metrics.py), and logs API requests (routes under
+    ``API_ROUTE_PREFIX``) that run more than settings.MOVIES_API_QUERY_BUDGET
+    queries. The admin and other pages are measured but have no budget.
+
+    Works in both sync and async stacks, so it does not force the async
+    views back into a thread. Queries are counted through current_query_stats
+    (see metrics.execute_wrapper), whichever thread runs them. A streaming
+    response is recorded when it is closed, with the queries, time and bytes
+    of producing its body.
+    """
+    sync_capable = True
+    async_capable = True
+    API_ROUTE_PREFIX = 'api/'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.query_budget = settings.MOVIES_API_QUERY_BUDGET
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = metrics.QueryStats()
+        token = metrics.current_query_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.current_query_stats.reset(token)
+        return self._finish(request, response, stats, started)
+
+    async def __acall__(self, request):
+        stats = metrics.QueryStats()
+        token = metrics.current_query_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current_query_stats.reset(token)
+        return self._finish(request, response, stats, started)
+
+    def _finish(self, request, response, stats, started):
+        if not response.streaming:
+            self._record(request, response, stats, time.perf_counter() - started, len(response.content))
+        elif response.is_async:
+            response.streaming_content = self._ameasure(response.streaming_content, request, response, stats, started)
+        else:
+            response.streaming_content = self._measure(response.streaming_content, request, response, stats, started)
+        return response
+
+    # The stream is consumed after __call__ returns, possibly in another
+    # context, so current_query_stats is set around each chunk only.
+
+    def _measure(self, content, request, response, stats, started):
+        chunks = iter(content)
+        size = 0
+        try:
+            while True:
+                token = metrics.current_query_stats.set(stats)
+                try:
+                    chunk = next(chunks, None)
+                finally:
+                    metrics.current_query_stats.reset(token)
+                if chunk is None:
+                    break
+                size += len(chunk)
+                yield chunk
+        finally:
+            self._record(request, response, stats, time.perf_counter() - started, size)
+
+    async def _ameasure(self, content, request, response, stats, started):
+        chunks = aiter(content)
+        size = 0
+        try:
+            while True:
+                token = metrics.current_query_stats.set(stats)
+                try:
+                    chunk = await anext(chunks, None)
+                finally:
+                    metrics.current_query_stats.reset(token)
+                if chunk is None:
+                    break
+                size += len(chunk)
+                yield chunk
+        finally:
+            self._record(request, response, stats, time.perf_counter() - started, size)
+
+    def _record(self, request, response, stats, duration, size):
+        match = request.resolver_match
+        route = match.route if match is not None else 'unmatched'
+        metrics.REQUESTS.inc((route, request.method, response.status_code))
+        metrics.REQUEST_DURATION.observe((route, request.method), duration)
+        metrics.SQL_QUERIES.observe((route,), stats.count)
+        metrics.SQL_DURATION.observe((route,), stats.duration)
+        metrics.RESPONSE_SIZE.observe((route,), size)
+
+        if route.startswith(self.API_ROUTE_PREFIX) and stats.count > self.query_budget:
+            metrics.QUERY_BUDGET_EXCEEDED.inc((route,))
+            logger.warning(
+                f"{request.method} {request.get_full_path()} ran {stats.count} SQL queries "
+                f"(budget {self.query_budget}), {stats.duration * 1000:.1f} ms of {duration * 1000:.1f} ms"
+            )
@@ -0,0 +1,65 @@
+from django.db import migrations
+
+# The content tables are owned by sqlite_to_postgres/movies_database.ddl and the
+# models are unmanaged. The same DDL is repeated here (it is idempotent) so that
+# later migrations adding indexes and triggers also apply to a fresh database,
+# e.g. the one created for the test run.
+CONTENT_TABLES_SQL = """
+CREATE TABLE IF NOT EXISTS content.film_work (
+    id UUID PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT,
+    creation_date DATE,
+    rating FLOAT,
+    type TEXT NOT NULL,
+    created TIMESTAMP WITH TIME ZONE,
+    modified TIMESTAMP WITH TIME ZONE
+);
+
+CREATE TABLE IF NOT EXISTS content.person (
+    id UUID PRIMARY KEY,
+    full_name TEXT NOT NULL,
+    created TIMESTAMP WITH TIME ZONE,
+    modified TIMESTAMP WITH TIME ZONE
+);
+
+CREATE TABLE IF NOT EXISTS content.person_film_work (
+    id UUID PRIMARY KEY,
+    person_id UUID NOT NULL REFERENCES content.person (id) ON DELETE CASCADE,
+    film_work_id UUID NOT NULL REFERENCES content.film_work (id) ON DELETE CASCADE,
+    role TEXT NOT NULL,
+    created TIMESTAMP WITH TIME ZONE
+);
+
+CREATE TABLE IF NOT EXISTS content.genre (
+    id UUID PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT,
+    created TIMESTAMP WITH TIME ZONE,
+    modified TIMESTAMP WITH TIME ZONE
+);
+
+CREATE TABLE IF NOT EXISTS content.genre_film_work (
+    id UUID PRIMARY KEY,
+    genre_id UUID NOT NULL REFERENCES content.genre (id) ON DELETE CASCADE,
+    film_work_id UUID NOT NULL REFERENCES content.film_work (id) ON DELETE CASCADE,
+    created TIMESTAMP WITH TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS film_work_creation_rating_idx ON content.film_work (creation_date, rating);
+
+CREATE UNIQUE INDEX IF NOT EXISTS film_work_person_role_idx ON content.person_film_work (film_work_id, person_id, role);
+
+CREATE UNIQUE INDEX IF NOT EXISTS film_work_genre_idx ON content.genre_film_work (film_work_id, genre_id);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0002_create_content_schema'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CONTENT_TABLES_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0003_create_content_tables'),
+    ]
+
+    # Expressions match movies.api.v1.pagination.SORT_KEYS: a forward scan serves
+    # the descending orderings, a backward scan the ascending ones.
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS film_work_modified_id_idx ON content.film_work "
+            "((COALESCE(modified, '1970-01-01 00:00:00+00'::timestamptz)) DESC, id DESC);",
+            reverse_sql="DROP INDEX IF EXISTS content.film_work_modified_id_idx;",
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS film_work_rating_id_idx ON content.film_work "
+            "((COALESCE(rating, -1.0::double precision)) DESC, id DESC);",
+            reverse_sql="DROP INDEX IF EXISTS content.film_work_rating_id_idx;",
+        ),
+    ]
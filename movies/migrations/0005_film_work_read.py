@@ -0,0 +1,223 @@
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+# content.film_work_read holds one row per film with the genre and person names
+# already aggregated, so the API never joins the junction tables. It is kept in
+# sync by statement-level triggers: every change to film_work, the junction
+# tables or genre/person names refreshes the rows of the affected films.
+READ_MODEL_SQL = """
+CREATE TABLE IF NOT EXISTS content.film_work_read (
+    id UUID PRIMARY KEY REFERENCES content.film_work (id) ON DELETE CASCADE,
+    title TEXT NOT NULL,
+    description TEXT,
+    creation_date DATE,
+    rating FLOAT,
+    type TEXT NOT NULL,
+    created TIMESTAMP WITH TIME ZONE,
+    modified TIMESTAMP WITH TIME ZONE,
+    genres TEXT[] NOT NULL DEFAULT '{}',
+    actors TEXT[] NOT NULL DEFAULT '{}',
+    directors TEXT[] NOT NULL DEFAULT '{}',
+    writers TEXT[] NOT NULL DEFAULT '{}'
+);
+
+CREATE OR REPLACE FUNCTION content.film_work_read_refresh(film_work_ids UUID[]) RETURNS void AS $$
+    INSERT INTO content.film_work_read AS r (
+        id, title, description, creation_date, rating, type, created, modified,
+        genres, actors, directors, writers
+    )
+    SELECT
+        fw.id, fw.title, fw.description, fw.creation_date, fw.rating, fw.type, fw.created, fw.modified,
+        ARRAY(
+            SELECT DISTINCT g.name
+            FROM content.genre_film_work gfw
+            JOIN content.genre g ON g.id = gfw.genre_id
+            WHERE gfw.film_work_id = fw.id
+            ORDER BY g.name
+        ),
+        ARRAY(
+            SELECT DISTINCT p.full_name
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id AND pfw.role = 'actor'
+            ORDER BY p.full_name
+        ),
+        ARRAY(
+            SELECT DISTINCT p.full_name
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id AND pfw.role = 'director'
+            ORDER BY p.full_name
+        ),
+        ARRAY(
+            SELECT DISTINCT p.full_name
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id AND pfw.role = 'writer'
+            ORDER BY p.full_name
+        )
+    FROM content.film_work fw
+    WHERE fw.id = ANY(film_work_ids)
+    ON CONFLICT (id) DO UPDATE SET
+        title = EXCLUDED.title,
+        description = EXCLUDED.description,
+        creation_date = EXCLUDED.creation_date,
+        rating = EXCLUDED.rating,
+        type = EXCLUDED.type,
+        created = EXCLUDED.created,
+        modified = EXCLUDED.modified,
+        genres = EXCLUDED.genres,
+        actors = EXCLUDED.actors,
+        directors = EXCLUDED.directors,
+        writers = EXCLUDED.writers;
+$$ LANGUAGE sql;
+
+-- Deletes need no handling here: film_work_read rows go away through the FK cascade.
+CREATE OR REPLACE FUNCTION content.film_work_read_on_film_work() RETURNS trigger AS $$
+BEGIN
+    PERFORM content.film_work_read_refresh(ARRAY(SELECT id FROM new_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Shared by genre_film_work and person_film_work, both reference the film as film_work_id.
+CREATE OR REPLACE FUNCTION content.film_work_read_on_link() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM content.film_work_read_refresh(ARRAY(SELECT DISTINCT film_work_id FROM new_rows));
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM content.film_work_read_refresh(ARRAY(
+            SELECT film_work_id FROM new_rows UNION SELECT film_work_id FROM old_rows
+        ));
+    ELSE
+        PERFORM content.film_work_read_refresh(ARRAY(SELECT DISTINCT film_work_id FROM old_rows));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION content.film_work_read_on_genre() RETURNS trigger AS $$
+BEGIN
+    PERFORM content.film_work_read_refresh(ARRAY(
+        SELECT DISTINCT gfw.film_work_id
+        FROM new_rows n
+        JOIN old_rows o ON o.id = n.id
+        JOIN content.genre_film_work gfw ON gfw.genre_id = n.id
+        WHERE n.name IS DISTINCT FROM o.name
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION content.film_work_read_on_person() RETURNS trigger AS $$
+BEGIN
+    PERFORM content.film_work_read_refresh(ARRAY(
+        SELECT DISTINCT pfw.film_work_id
+        FROM new_rows n
+        JOIN old_rows o ON o.id = n.id
+        JOIN content.person_film_work pfw ON pfw.person_id = n.id
+        WHERE n.full_name IS DISTINCT FROM o.full_name
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER film_work_read_film_work_insert
+    AFTER INSERT ON content.film_work REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.film_work_read_on_film_work();
+CREATE TRIGGER film_work_read_film_work_update
+    AFTER UPDATE ON content.film_work REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.film_work_read_on_film_work();
+
+CREATE TRIGGER film_work_read_genre_film_work_insert
+    AFTER INSERT ON content.genre_film_work REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.film_work_read_on_link();
+CREATE TRIGGER film_work_read_genre_film_work_update
+    AFTER UPDATE ON content.genre_film_work REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.film_work_read_on_link();
+CREATE TRIGGER film_work_read_genre_film_work_delete
+    AFTER DELETE ON content.genre_film_work REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.film_work_read_on_link();
+
+CREATE TRIGGER film_work_read_person_film_work_insert
+    AFTER INSERT ON content.person_film_work REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.film_work_read_on_link();
+CREATE TRIGGER film_work_read_person_film_work_update
+    AFTER UPDATE ON content.person_film_work REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.film_work_read_on_link();
+CREATE TRIGGER film_work_read_person_film_work_delete
+    AFTER DELETE ON content.person_film_work REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.film_work_read_on_link();
+
+CREATE TRIGGER film_work_read_genre_update
+    AFTER UPDATE ON content.genre REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.film_work_read_on_genre();
+CREATE TRIGGER film_work_read_person_update
+    AFTER UPDATE ON content.person REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.film_work_read_on_person();
+
+SELECT content.film_work_read_refresh(ARRAY(SELECT id FROM content.film_work));
+
+-- Same expressions as movies.api.v1.pagination.SORT_KEYS; the API pages over this table now.
+CREATE INDEX IF NOT EXISTS film_work_read_modified_id_idx ON content.film_work_read
+    ((COALESCE(modified, '1970-01-01 00:00:00+00'::timestamptz)) DESC, id DESC);
+CREATE INDEX IF NOT EXISTS film_work_read_rating_id_idx ON content.film_work_read
+    ((COALESCE(rating, -1.0::double precision)) DESC, id DESC);
+DROP INDEX IF EXISTS content.film_work_modified_id_idx;
+DROP INDEX IF EXISTS content.film_work_rating_id_idx;
+"""
+
+DROP_READ_MODEL_SQL = """
+DROP TRIGGER IF EXISTS film_work_read_film_work_insert ON content.film_work;
+DROP TRIGGER IF EXISTS film_work_read_film_work_update ON content.film_work;
+DROP TRIGGER IF EXISTS film_work_read_genre_film_work_insert ON content.genre_film_work;
+DROP TRIGGER IF EXISTS film_work_read_genre_film_work_update ON content.genre_film_work;
+DROP TRIGGER IF EXISTS film_work_read_genre_film_work_delete ON content.genre_film_work;
+DROP TRIGGER IF EXISTS film_work_read_person_film_work_insert ON content.person_film_work;
+DROP TRIGGER IF EXISTS film_work_read_person_film_work_update ON content.person_film_work;
+DROP TRIGGER IF EXISTS film_work_read_person_film_work_delete ON content.person_film_work;
+DROP TRIGGER IF EXISTS film_work_read_genre_update ON content.genre;
+DROP TRIGGER IF EXISTS film_work_read_person_update ON content.person;
+DROP FUNCTION IF EXISTS content.film_work_read_on_film_work();
+DROP FUNCTION IF EXISTS content.film_work_read_on_link();
+DROP FUNCTION IF EXISTS content.film_work_read_on_genre();
+DROP FUNCTION IF EXISTS content.film_work_read_on_person();
+DROP FUNCTION IF EXISTS content.film_work_read_refresh(UUID[]);
+DROP TABLE IF EXISTS content.film_work_read;
+CREATE INDEX IF NOT EXISTS film_work_modified_id_idx ON content.film_work
+    ((COALESCE(modified, '1970-01-01 00:00:00+00'::timestamptz)) DESC, id DESC);
+CREATE INDEX IF NOT EXISTS film_work_rating_id_idx ON content.film_work
+    ((COALESCE(rating, -1.0::double precision)) DESC, id DESC);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0004_film_work_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(READ_MODEL_SQL, reverse_sql=DROP_READ_MODEL_SQL),
+        migrations.CreateModel(
+            name='FilmWorkRead',
+            fields=[
+                ('id', models.UUIDField(primary_key=True, serialize=False)),
+                ('title', models.TextField()),
+                ('description', models.TextField(null=True)),
+                ('creation_date', models.DateField(null=True)),
+                ('rating', models.FloatField(null=True)),
+                ('type', models.TextField()),
+                ('created', models.DateTimeField(null=True)),
+                ('modified', models.DateTimeField(null=True)),
+                ('genres', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), size=None)),
+                ('actors', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), size=None)),
+                ('directors', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), size=None)),
+                ('writers', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), size=None)),
+            ],
+            options={
+                'db_table': 'content"."film_work_read',
+                'managed': False,
+            },
+        ),
+    ]
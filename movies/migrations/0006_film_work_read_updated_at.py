@@ -0,0 +1,134 @@
+from django.db import migrations, models
+
+# updated_at records when the read row was last refreshed, i.e. the last change
+# to the film itself or to any of its genres/persons. The API derives
+# ETag/Last-Modified validators from it.
+UPDATED_AT_SQL = """
+ALTER TABLE content.film_work_read ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now();
+
+CREATE OR REPLACE FUNCTION content.film_work_read_refresh(film_work_ids UUID[]) RETURNS void AS $$
+    INSERT INTO content.film_work_read AS r (
+        id, title, description, creation_date, rating, type, created, modified,
+        genres, actors, directors, writers, updated_at
+    )
+    SELECT
+        fw.id, fw.title, fw.description, fw.creation_date, fw.rating, fw.type, fw.created, fw.modified,
+        ARRAY(
+            SELECT DISTINCT g.name
+            FROM content.genre_film_work gfw
+            JOIN content.genre g ON g.id = gfw.genre_id
+            WHERE gfw.film_work_id = fw.id
+            ORDER BY g.name
+        ),
+        ARRAY(
+            SELECT DISTINCT p.full_name
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id AND pfw.role = 'actor'
+            ORDER BY p.full_name
+        ),
+        ARRAY(
+            SELECT DISTINCT p.full_name
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id AND pfw.role = 'director'
+            ORDER BY p.full_name
+        ),
+        ARRAY(
+            SELECT DISTINCT p.full_name
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id AND pfw.role = 'writer'
+            ORDER BY p.full_name
+        ),
+        now()
+    FROM content.film_work fw
+    WHERE fw.id = ANY(film_work_ids)
+    ON CONFLICT (id) DO UPDATE SET
+        title = EXCLUDED.title,
+        description = EXCLUDED.description,
+        creation_date = EXCLUDED.creation_date,
+        rating = EXCLUDED.rating,
+        type = EXCLUDED.type,
+        created = EXCLUDED.created,
+        modified = EXCLUDED.modified,
+        genres = EXCLUDED.genres,
+        actors = EXCLUDED.actors,
+        directors = EXCLUDED.directors,
+        writers = EXCLUDED.writers,
+        updated_at = EXCLUDED.updated_at;
+$$ LANGUAGE sql;
+
+CREATE INDEX IF NOT EXISTS film_work_read_updated_at_idx ON content.film_work_read (updated_at);
+"""
+
+DROP_UPDATED_AT_SQL = """
+CREATE OR REPLACE FUNCTION content.film_work_read_refresh(film_work_ids UUID[]) RETURNS void AS $$
+    INSERT INTO content.film_work_read AS r (
+        id, title, description, creation_date, rating, type, created, modified,
+        genres, actors, directors, writers
+    )
+    SELECT
+        fw.id, fw.title, fw.description, fw.creation_date, fw.rating, fw.type, fw.created, fw.modified,
+        ARRAY(
+            SELECT DISTINCT g.name
+            FROM content.genre_film_work gfw
+            JOIN content.genre g ON g.id = gfw.genre_id
+            WHERE gfw.film_work_id = fw.id
+            ORDER BY g.name
+        ),
+        ARRAY(
+            SELECT DISTINCT p.full_name
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id AND pfw.role = 'actor'
+            ORDER BY p.full_name
+        ),
+        ARRAY(
+            SELECT DISTINCT p.full_name
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id AND pfw.role = 'director'
+            ORDER BY p.full_name
+        ),
+        ARRAY(
+            SELECT DISTINCT p.full_name
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id AND pfw.role = 'writer'
+            ORDER BY p.full_name
+        )
+    FROM content.film_work fw
+    WHERE fw.id = ANY(film_work_ids)
+    ON CONFLICT (id) DO UPDATE SET
+        title = EXCLUDED.title,
+        description = EXCLUDED.description,
+        creation_date = EXCLUDED.creation_date,
+        rating = EXCLUDED.rating,
+        type = EXCLUDED.type,
+        created = EXCLUDED.created,
+        modified = EXCLUDED.modified,
+        genres = EXCLUDED.genres,
+        actors = EXCLUDED.actors,
+        directors = EXCLUDED.directors,
+        writers = EXCLUDED.writers;
+$$ LANGUAGE sql;
+
+ALTER TABLE content.film_work_read DROP COLUMN IF EXISTS updated_at;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0005_film_work_read'),
+    ]
+
+    operations = [
+        migrations.RunSQL(UPDATED_AT_SQL, reverse_sql=DROP_UPDATED_AT_SQL),
+        migrations.AddField(
+            model_name='filmworkread',
+            name='updated_at',
+            field=models.DateTimeField(),
+        ),
+    ]
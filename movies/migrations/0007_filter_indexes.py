@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0006_film_work_read_updated_at'),
+    ]
+
+    # The existing unique indexes on the junction tables lead with film_work_id,
+    # which does not help the EXISTS lookups by genre or person.
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS genre_film_work_genre_idx ON content.genre_film_work (genre_id, film_work_id);",
+            reverse_sql="DROP INDEX IF EXISTS content.genre_film_work_genre_idx;",
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS person_film_work_person_role_idx "
+            "ON content.person_film_work (person_id, role, film_work_id);",
+            reverse_sql="DROP INDEX IF EXISTS content.person_film_work_person_role_idx;",
+        ),
+        # Counterpart of film_work_creation_rating_idx; the API reads film_work_read.
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS film_work_read_creation_rating_idx "
+            "ON content.film_work_read (creation_date, rating);",
+            reverse_sql="DROP INDEX IF EXISTS content.film_work_read_creation_rating_idx;",
+        ),
+    ]
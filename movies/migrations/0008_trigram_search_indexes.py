@@ -0,0 +1,46 @@
+from django.db import migrations
+
+# Admin search runs icontains/istartswith lookups, which Django on Postgres
+# compiles to UPPER("column"::text) LIKE UPPER('%term%'). A GIN index with
+# gin_trgm_ops over the same expression serves both without a sequential scan.
+# pg_trgm ships with contrib and is trusted, but some builds leave contrib out:
+# there the indexes are skipped with a warning and search keeps working, only
+# slower.
+TRIGRAM_INDEXES_SQL = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        RAISE WARNING 'pg_trgm is not available, admin search runs without trigram indexes';
+        RETURN;
+    END IF;
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    CREATE INDEX IF NOT EXISTS film_work_title_trgm_idx
+        ON content.film_work USING gin ((UPPER(title::text)) gin_trgm_ops);
+    CREATE INDEX IF NOT EXISTS film_work_description_trgm_idx
+        ON content.film_work USING gin ((UPPER(description)) gin_trgm_ops);
+    CREATE INDEX IF NOT EXISTS person_full_name_trgm_idx
+        ON content.person USING gin ((UPPER(full_name::text)) gin_trgm_ops);
+    CREATE INDEX IF NOT EXISTS genre_name_trgm_idx
+        ON content.genre USING gin ((UPPER(name::text)) gin_trgm_ops);
+END
+$$;
+"""
+
+# The extension stays: other database objects may have come to rely on it.
+DROP_TRIGRAM_INDEXES_SQL = """
+DROP INDEX IF EXISTS content.film_work_title_trgm_idx;
+DROP INDEX IF EXISTS content.film_work_description_trgm_idx;
+DROP INDEX IF EXISTS content.person_full_name_trgm_idx;
+DROP INDEX IF EXISTS content.genre_name_trgm_idx;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0007_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(TRIGRAM_INDEXES_SQL, reverse_sql=DROP_TRIGRAM_INDEXES_SQL),
+    ]
@@ -0,0 +1,102 @@
+from django.db import migrations, models
+
+# content.row_count holds the exact number of rows of the catalog tables, so
+# unfiltered lists (the admin changelists, the API and its catalog ETag) do not
+# run COUNT(*). Statement-level triggers add the size of the transition tables,
+# which costs one counter update per statement whatever the number of rows.
+# Bulk loads that disable triggers (benchmarks.seed) call row_count_refresh().
+COUNTED_TABLES = ('film_work', 'film_work_read', 'genre', 'person')
+
+ROW_COUNT_SQL = """
+CREATE TABLE IF NOT EXISTS content.row_count (
+    table_name TEXT PRIMARY KEY,
+    count BIGINT NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION content.row_count_refresh(counted_table TEXT) RETURNS void AS $$
+BEGIN
+    EXECUTE format(
+        'INSERT INTO content.row_count (table_name, count) SELECT %L, count(*) FROM content.%I '
+        'ON CONFLICT (table_name) DO UPDATE SET count = EXCLUDED.count',
+        counted_table, counted_table
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION content.row_count_on_insert() RETURNS trigger AS $$
+BEGIN
+    UPDATE content.row_count SET count = count + (SELECT count(*) FROM new_rows)
+    WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION content.row_count_on_delete() RETURNS trigger AS $$
+BEGIN
+    UPDATE content.row_count SET count = count - (SELECT count(*) FROM old_rows)
+    WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION content.row_count_on_truncate() RETURNS trigger AS $$
+BEGIN
+    UPDATE content.row_count SET count = 0 WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+COUNTED_TABLE_SQL = """
+CREATE TRIGGER row_count_{table}_insert
+    AFTER INSERT ON content.{table} REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.row_count_on_insert();
+CREATE TRIGGER row_count_{table}_delete
+    AFTER DELETE ON content.{table} REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.row_count_on_delete();
+CREATE TRIGGER row_count_{table}_truncate
+    AFTER TRUNCATE ON content.{table}
+    FOR EACH STATEMENT EXECUTE FUNCTION content.row_count_on_truncate();
+SELECT content.row_count_refresh('{table}');
+"""
+
+DROP_COUNTED_TABLE_SQL = """
+DROP TRIGGER IF EXISTS row_count_{table}_insert ON content.{table};
+DROP TRIGGER IF EXISTS row_count_{table}_delete ON content.{table};
+DROP TRIGGER IF EXISTS row_count_{table}_truncate ON content.{table};
+"""
+
+DROP_ROW_COUNT_SQL = """
+DROP FUNCTION IF EXISTS content.row_count_on_insert();
+DROP FUNCTION IF EXISTS content.row_count_on_delete();
+DROP FUNCTION IF EXISTS content.row_count_on_truncate();
+DROP FUNCTION IF EXISTS content.row_count_refresh(TEXT);
+DROP TABLE IF EXISTS content.row_count;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0008_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            ROW_COUNT_SQL
+            + ''.join(COUNTED_TABLE_SQL.format(table=table) for table in COUNTED_TABLES),
+            reverse_sql=''.join(DROP_COUNTED_TABLE_SQL.format(table=table) for table in COUNTED_TABLES)
+            + DROP_ROW_COUNT_SQL,
+        ),
+        migrations.CreateModel(
+            name='RowCount',
+            fields=[
+                ('table_name', models.TextField(primary_key=True, serialize=False)),
+                ('count', models.BigIntegerField()),
+            ],
+            options={
+                'db_table': 'content"."row_count',
+                'managed': False,
+            },
+        ),
+    ]
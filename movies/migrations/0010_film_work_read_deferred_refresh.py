@@ -0,0 +1,71 @@
+from django.db import migrations
+
+# Bulk writers (movies.bulk) touch film_work and both link tables for the same
+# films. Each statement would refresh film_work_read for all of them, so they
+# set content.film_work_read_deferred for their transaction instead and refresh
+# the affected films once at the end. A custom setting needs no privileges,
+# unlike disabling the triggers.
+DEFERRED_REFRESH_SQL = """
+CREATE OR REPLACE FUNCTION content.film_work_read_on_film_work() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('content.film_work_read_deferred', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    PERFORM content.film_work_read_refresh(ARRAY(SELECT id FROM new_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION content.film_work_read_on_link() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('content.film_work_read_deferred', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'INSERT' THEN
+        PERFORM content.film_work_read_refresh(ARRAY(SELECT DISTINCT film_work_id FROM new_rows));
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM content.film_work_read_refresh(ARRAY(
+            SELECT film_work_id FROM new_rows UNION SELECT film_work_id FROM old_rows
+        ));
+    ELSE
+        PERFORM content.film_work_read_refresh(ARRAY(SELECT DISTINCT film_work_id FROM old_rows));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+IMMEDIATE_REFRESH_SQL = """
+CREATE OR REPLACE FUNCTION content.film_work_read_on_film_work() RETURNS trigger AS $$
+BEGIN
+    PERFORM content.film_work_read_refresh(ARRAY(SELECT id FROM new_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION content.film_work_read_on_link() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM content.film_work_read_refresh(ARRAY(SELECT DISTINCT film_work_id FROM new_rows));
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM content.film_work_read_refresh(ARRAY(
+            SELECT film_work_id FROM new_rows UNION SELECT film_work_id FROM old_rows
+        ));
+    ELSE
+        PERFORM content.film_work_read_refresh(ARRAY(SELECT DISTINCT film_work_id FROM old_rows));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0009_row_counts'),
+    ]
+
+    operations = [
+        migrations.RunSQL(DEFERRED_REFRESH_SQL, reverse_sql=IMMEDIATE_REFRESH_SQL),
+    ]
@@ -0,0 +1,119 @@
+from django.db import migrations
+
+# One counter row per table serializes its writers: every statement updates
+# that row and holds its lock until commit, so concurrent imports into the same
+# table wait for each other. The counts are now split over ROW_COUNT_SLOTS rows
+# per table. A statement adds its delta to the slot of its backend
+# (pg_backend_pid() modulo the number of slots), so concurrent sessions mostly
+# update different rows. content.row_count becomes a view summing the slots,
+# which keeps RowCount and its readers unchanged; a read sums at most
+# ROW_COUNT_SLOTS rows through the primary key.
+ROW_COUNT_SLOTS = 16
+
+ROW_COUNT_SLOTS_SQL = f"""
+CREATE TABLE content.row_count_slot (
+    table_name TEXT NOT NULL,
+    slot SMALLINT NOT NULL,
+    count BIGINT NOT NULL,
+    PRIMARY KEY (table_name, slot)
+);
+INSERT INTO content.row_count_slot (table_name, slot, count) SELECT table_name, 0, count FROM content.row_count;
+DROP TABLE content.row_count;
+
+CREATE VIEW content.row_count AS
+    SELECT table_name, sum(count)::BIGINT AS count FROM content.row_count_slot GROUP BY table_name;
+
+CREATE OR REPLACE FUNCTION content.row_count_add(counted_table TEXT, delta BIGINT) RETURNS void AS $$
+    INSERT INTO content.row_count_slot AS s (table_name, slot, count)
+    VALUES (counted_table, pg_backend_pid() % {ROW_COUNT_SLOTS}, delta)
+    ON CONFLICT (table_name, slot) DO UPDATE SET count = s.count + EXCLUDED.count;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION content.row_count_refresh(counted_table TEXT) RETURNS void AS $$
+BEGIN
+    UPDATE content.row_count_slot SET count = 0 WHERE table_name = counted_table;
+    EXECUTE format(
+        'INSERT INTO content.row_count_slot AS s (table_name, slot, count) SELECT %L, 0, count(*) FROM content.%I '
+        'ON CONFLICT (table_name, slot) DO UPDATE SET count = EXCLUDED.count',
+        counted_table, counted_table
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION content.row_count_on_insert() RETURNS trigger AS $$
+BEGIN
+    PERFORM content.row_count_add(TG_TABLE_NAME, (SELECT count(*) FROM new_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION content.row_count_on_delete() RETURNS trigger AS $$
+BEGIN
+    PERFORM content.row_count_add(TG_TABLE_NAME, -(SELECT count(*) FROM old_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION content.row_count_on_truncate() RETURNS trigger AS $$
+BEGIN
+    UPDATE content.row_count_slot SET count = 0 WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+SINGLE_ROW_COUNT_SQL = """
+DROP VIEW content.row_count;
+CREATE TABLE content.row_count (
+    table_name TEXT PRIMARY KEY,
+    count BIGINT NOT NULL
+);
+INSERT INTO content.row_count (table_name, count)
+    SELECT table_name, sum(count) FROM content.row_count_slot GROUP BY table_name;
+DROP TABLE content.row_count_slot;
+DROP FUNCTION content.row_count_add(TEXT, BIGINT);
+
+CREATE OR REPLACE FUNCTION content.row_count_refresh(counted_table TEXT) RETURNS void AS $$
+BEGIN
+    EXECUTE format(
+        'INSERT INTO content.row_count (table_name, count) SELECT %L, count(*) FROM content.%I '
+        'ON CONFLICT (table_name) DO UPDATE SET count = EXCLUDED.count',
+        counted_table, counted_table
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION content.row_count_on_insert() RETURNS trigger AS $$
+BEGIN
+    UPDATE content.row_count SET count = count + (SELECT count(*) FROM new_rows)
+    WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION content.row_count_on_delete() RETURNS trigger AS $$
+BEGIN
+    UPDATE content.row_count SET count = count - (SELECT count(*) FROM old_rows)
+    WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION content.row_count_on_truncate() RETURNS trigger AS $$
+BEGIN
+    UPDATE content.row_count SET count = 0 WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0010_film_work_read_deferred_refresh'),
+    ]
+
+    operations = [
+        migrations.RunSQL(ROW_COUNT_SLOTS_SQL, reverse_sql=SINGLE_ROW_COUNT_SQL),
+    ]
@@ -0,0 +1,228 @@
+from django.db import migrations, models
+
+# Validators that survive concurrent writers.
+#
+# * The catalog ETag was built from the newest updated_at, but updated_at was
+#   now(), the start of the writing transaction. A transaction that started
+#   earlier and committed later added rows older than the newest one, so the
+#   ETag did not change and clients kept getting 304 for a stale catalog.
+#   Every statement that changes a counted table now also adds 1 to the
+#   ``changes`` of its row_count slot (the 16 slots of migration 0011), and
+#   film_work_read gets an update trigger for it. The sum only grows and each
+#   commit that touched the table raises it, so the catalog ETag is built from
+#   the row count and the number of changes instead.
+# * updated_at is set to clock_timestamp() when the row is written, after the
+#   row lock is taken, and always moves forward, so the validators of a film
+#   change with every committed refresh.
+CHANGES_SQL = """
+ALTER TABLE content.row_count_slot ADD COLUMN changes BIGINT NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE VIEW content.row_count AS
+    SELECT table_name, sum(count)::BIGINT AS count, sum(changes)::BIGINT AS changes
+    FROM content.row_count_slot GROUP BY table_name;
+
+CREATE OR REPLACE FUNCTION content.row_count_add(counted_table TEXT, delta BIGINT) RETURNS void AS $$
+    INSERT INTO content.row_count_slot AS s (table_name, slot, count, changes)
+    VALUES (counted_table, pg_backend_pid() % 16, delta, 1)
+    ON CONFLICT (table_name, slot) DO UPDATE SET count = s.count + EXCLUDED.count, changes = s.changes + 1;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION content.row_count_on_insert() RETURNS trigger AS $$
+BEGIN
+    IF EXISTS (SELECT FROM new_rows) THEN
+        PERFORM content.row_count_add(TG_TABLE_NAME, (SELECT count(*) FROM new_rows));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION content.row_count_on_update() RETURNS trigger AS $$
+BEGIN
+    IF EXISTS (SELECT FROM new_rows) THEN
+        PERFORM content.row_count_add(TG_TABLE_NAME, 0);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION content.row_count_on_delete() RETURNS trigger AS $$
+BEGIN
+    IF EXISTS (SELECT FROM old_rows) THEN
+        PERFORM content.row_count_add(TG_TABLE_NAME, -(SELECT count(*) FROM old_rows));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION content.row_count_on_truncate() RETURNS trigger AS $$
+BEGIN
+    UPDATE content.row_count_slot SET count = 0 WHERE table_name = TG_TABLE_NAME;
+    PERFORM content.row_count_add(TG_TABLE_NAME, 0);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER row_count_film_work_read_update
+    AFTER UPDATE ON content.film_work_read REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.row_count_on_update();
+
+CREATE OR REPLACE FUNCTION content.film_work_read_refresh(film_work_ids UUID[]) RETURNS void AS $$
+    INSERT INTO content.film_work_read AS r (
+        id, title, description, creation_date, rating, type, created, modified,
+        genres, actors, directors, writers, updated_at
+    )
+    SELECT
+        fw.id, fw.title, fw.description, fw.creation_date, fw.rating, fw.type, fw.created, fw.modified,
+        ARRAY(
+            SELECT DISTINCT g.name
+            FROM content.genre_film_work gfw
+            JOIN content.genre g ON g.id = gfw.genre_id
+            WHERE gfw.film_work_id = fw.id
+            ORDER BY g.name
+        ),
+        ARRAY(
+            SELECT DISTINCT p.full_name
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id AND pfw.role = 'actor'
+            ORDER BY p.full_name
+        ),
+        ARRAY(
+            SELECT DISTINCT p.full_name
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id AND pfw.role = 'director'
+            ORDER BY p.full_name
+        ),
+        ARRAY(
+            SELECT DISTINCT p.full_name
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id AND pfw.role = 'writer'
+            ORDER BY p.full_name
+        ),
+        clock_timestamp()
+    FROM content.film_work fw
+    WHERE fw.id = ANY(film_work_ids)
+    ON CONFLICT (id) DO UPDATE SET
+        title = EXCLUDED.title,
+        description = EXCLUDED.description,
+        creation_date = EXCLUDED.creation_date,
+        rating = EXCLUDED.rating,
+        type = EXCLUDED.type,
+        created = EXCLUDED.created,
+        modified = EXCLUDED.modified,
+        genres = EXCLUDED.genres,
+        actors = EXCLUDED.actors,
+        directors = EXCLUDED.directors,
+        writers = EXCLUDED.writers,
+        updated_at = greatest(clock_timestamp(), r.updated_at + interval '1 microsecond');
+$$ LANGUAGE sql;
+"""
+
+DROP_CHANGES_SQL = """
+DROP TRIGGER IF EXISTS row_count_film_work_read_update ON content.film_work_read;
+DROP FUNCTION IF EXISTS content.row_count_on_update();
+
+CREATE OR REPLACE FUNCTION content.row_count_on_insert() RETURNS trigger AS $$
+BEGIN
+    PERFORM content.row_count_add(TG_TABLE_NAME, (SELECT count(*) FROM new_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION content.row_count_on_delete() RETURNS trigger AS $$
+BEGIN
+    PERFORM content.row_count_add(TG_TABLE_NAME, -(SELECT count(*) FROM old_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION content.row_count_on_truncate() RETURNS trigger AS $$
+BEGIN
+    UPDATE content.row_count_slot SET count = 0 WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION content.row_count_add(counted_table TEXT, delta BIGINT) RETURNS void AS $$
+    INSERT INTO content.row_count_slot AS s (table_name, slot, count)
+    VALUES (counted_table, pg_backend_pid() % 16, delta)
+    ON CONFLICT (table_name, slot) DO UPDATE SET count = s.count + EXCLUDED.count;
+$$ LANGUAGE sql;
+
+DROP VIEW content.row_count;
+CREATE VIEW content.row_count AS
+    SELECT table_name, sum(count)::BIGINT AS count FROM content.row_count_slot GROUP BY table_name;
+ALTER TABLE content.row_count_slot DROP COLUMN changes;
+
+CREATE OR REPLACE FUNCTION content.film_work_read_refresh(film_work_ids UUID[]) RETURNS void AS $$
+    INSERT INTO content.film_work_read AS r (
+        id, title, description, creation_date, rating, type, created, modified,
+        genres, actors, directors, writers, updated_at
+    )
+    SELECT
+        fw.id, fw.title, fw.description, fw.creation_date, fw.rating, fw.type, fw.created, fw.modified,
+        ARRAY(
+            SELECT DISTINCT g.name
+            FROM content.genre_film_work gfw
+            JOIN content.genre g ON g.id = gfw.genre_id
+            WHERE gfw.film_work_id = fw.id
+            ORDER BY g.name
+        ),
+        ARRAY(
+            SELECT DISTINCT p.full_name
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id AND pfw.role = 'actor'
+            ORDER BY p.full_name
+        ),
+        ARRAY(
+            SELECT DISTINCT p.full_name
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id AND pfw.role = 'director'
+            ORDER BY p.full_name
+        ),
+        ARRAY(
+            SELECT DISTINCT p.full_name
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id AND pfw.role = 'writer'
+            ORDER BY p.full_name
+        ),
+        now()
+    FROM content.film_work fw
+    WHERE fw.id = ANY(film_work_ids)
+    ON CONFLICT (id) DO UPDATE SET
+        title = EXCLUDED.title,
+        description = EXCLUDED.description,
+        creation_date = EXCLUDED.creation_date,
+        rating = EXCLUDED.rating,
+        type = EXCLUDED.type,
+        created = EXCLUDED.created,
+        modified = EXCLUDED.modified,
+        genres = EXCLUDED.genres,
+        actors = EXCLUDED.actors,
+        directors = EXCLUDED.directors,
+        writers = EXCLUDED.writers,
+        updated_at = EXCLUDED.updated_at;
+$$ LANGUAGE sql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0011_row_count_slots'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CHANGES_SQL, reverse_sql=DROP_CHANGES_SQL),
+        migrations.AddField(
+            model_name='rowcount',
+            name='changes',
+            field=models.BigIntegerField(default=0),
+            preserve_default=False,
+        ),
+    ]
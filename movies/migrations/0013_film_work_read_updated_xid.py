@@ -0,0 +1,137 @@
+from django.db import migrations
+
+# updated_xid is the (epoch-extended) id of the transaction that last refreshed
+# the read row. The export advertises the Postgres snapshot it started from,
+# and the next incremental export returns the rows whose transaction was not
+# visible in that snapshot. Unlike a time watermark, this cannot miss a
+# transaction that started before the export and committed after it. Rows
+# written before this migration get 0, which every snapshot sees.
+UPDATED_XID_SQL = """
+ALTER TABLE content.film_work_read ADD COLUMN IF NOT EXISTS updated_xid XID8 NOT NULL DEFAULT '0';
+ALTER TABLE content.film_work_read ALTER COLUMN updated_xid SET DEFAULT pg_current_xact_id();
+
+CREATE OR REPLACE FUNCTION content.film_work_read_refresh(film_work_ids UUID[]) RETURNS void AS $$
+    INSERT INTO content.film_work_read AS r (
+        id, title, description, creation_date, rating, type, created, modified,
+        genres, actors, directors, writers, updated_at, updated_xid
+    )
+    SELECT
+        fw.id, fw.title, fw.description, fw.creation_date, fw.rating, fw.type, fw.created, fw.modified,
+        ARRAY(
+            SELECT DISTINCT g.name
+            FROM content.genre_film_work gfw
+            JOIN content.genre g ON g.id = gfw.genre_id
+            WHERE gfw.film_work_id = fw.id
+            ORDER BY g.name
+        ),
+        ARRAY(
+            SELECT DISTINCT p.full_name
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id AND pfw.role = 'actor'
+            ORDER BY p.full_name
+        ),
+        ARRAY(
+            SELECT DISTINCT p.full_name
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id AND pfw.role = 'director'
+            ORDER BY p.full_name
+        ),
+        ARRAY(
+            SELECT DISTINCT p.full_name
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id AND pfw.role = 'writer'
+            ORDER BY p.full_name
+        ),
+        clock_timestamp(),
+        pg_current_xact_id()
+    FROM content.film_work fw
+    WHERE fw.id = ANY(film_work_ids)
+    ON CONFLICT (id) DO UPDATE SET
+        title = EXCLUDED.title,
+        description = EXCLUDED.description,
+        creation_date = EXCLUDED.creation_date,
+        rating = EXCLUDED.rating,
+        type = EXCLUDED.type,
+        created = EXCLUDED.created,
+        modified = EXCLUDED.modified,
+        genres = EXCLUDED.genres,
+        actors = EXCLUDED.actors,
+        directors = EXCLUDED.directors,
+        writers = EXCLUDED.writers,
+        updated_at = greatest(clock_timestamp(), r.updated_at + interval '1 microsecond'),
+        updated_xid = EXCLUDED.updated_xid;
+$$ LANGUAGE sql;
+
+CREATE INDEX IF NOT EXISTS film_work_read_updated_xid_idx ON content.film_work_read (updated_xid);
+"""
+
+DROP_UPDATED_XID_SQL = """
+CREATE OR REPLACE FUNCTION content.film_work_read_refresh(film_work_ids UUID[]) RETURNS void AS $$
+    INSERT INTO content.film_work_read AS r (
+        id, title, description, creation_date, rating, type, created, modified,
+        genres, actors, directors, writers, updated_at
+    )
+    SELECT
+        fw.id, fw.title, fw.description, fw.creation_date, fw.rating, fw.type, fw.created, fw.modified,
+        ARRAY(
+            SELECT DISTINCT g.name
+            FROM content.genre_film_work gfw
+            JOIN content.genre g ON g.id = gfw.genre_id
+            WHERE gfw.film_work_id = fw.id
+            ORDER BY g.name
+        ),
+        ARRAY(
+            SELECT DISTINCT p.full_name
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id AND pfw.role = 'actor'
+            ORDER BY p.full_name
+        ),
+        ARRAY(
+            SELECT DISTINCT p.full_name
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id AND pfw.role = 'director'
+            ORDER BY p.full_name
+        ),
+        ARRAY(
+            SELECT DISTINCT p.full_name
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id AND pfw.role = 'writer'
+            ORDER BY p.full_name
+        ),
+        clock_timestamp()
+    FROM content.film_work fw
+    WHERE fw.id = ANY(film_work_ids)
+    ON CONFLICT (id) DO UPDATE SET
+        title = EXCLUDED.title,
+        description = EXCLUDED.description,
+        creation_date = EXCLUDED.creation_date,
+        rating = EXCLUDED.rating,
+        type = EXCLUDED.type,
+        created = EXCLUDED.created,
+        modified = EXCLUDED.modified,
+        genres = EXCLUDED.genres,
+        actors = EXCLUDED.actors,
+        directors = EXCLUDED.directors,
+        writers = EXCLUDED.writers,
+        updated_at = greatest(clock_timestamp(), r.updated_at + interval '1 microsecond');
+$$ LANGUAGE sql;
+
+ALTER TABLE content.film_work_read DROP COLUMN IF EXISTS updated_xid;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0012_catalog_changes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(UPDATED_XID_SQL, reverse_sql=DROP_UPDATED_XID_SQL),
+    ]
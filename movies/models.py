@@ -1,3 +1,4 @@
+from django.contrib.postgres.fields import ArrayField
 from django.db import models
 import uuid
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -22,7 +23,7 @@ class Genre(UUIDMixin, TimeStampedMixin):
     description = models.TextField(_('description'), blank=True)
 
     class Meta:
-        db_table = "content.genre"
+        db_table = 'content"."genre'
         verbose_name = _('Жанр')
         verbose_name_plural = _('Жанры')
 
@@ -53,7 +54,7 @@ class FilmWork(UUIDMixin, TimeStampedMixin):
     
 
     class Meta:
-        db_table = "content.film_work"
+        db_table = 'content"."film_work'
         verbose_name = _('film work')
         verbose_name_plural = _('film works')
 
@@ -67,7 +68,7 @@ class GenreFilmWork(UUIDMixin):
     created = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        db_table = "content.genre_film_work"
+        db_table = 'content"."genre_film_work'
         verbose_name = _('genre of film work')
         unique_together = ('film_work', 'genre')
         verbose_name_plural = _('genres of film works')
@@ -76,7 +77,7 @@ class Person(UUIDMixin, TimeStampedMixin):
     full_name = models.CharField(_('full name'), max_length=255)
 
     class Meta:
-        db_table = "content.person"
+        db_table = 'content"."person'
         verbose_name = _('Персона')
         verbose_name_plural = _('Персоны')
 
@@ -95,7 +96,47 @@ class PersonFilmWork(UUIDMixin):
     created = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        db_table = "content.person_film_work"
+        db_table = 'content"."person_film_work'
         verbose_name = _('film work participant')
         verbose_name_plural = _('film work participants')
         unique_together = ('film_work', 'person', 'role')
+
+
+class FilmWorkRead(models.Model):
+    """
+    Denormalized, read-only copy of a film with genre and person names aggregated.
+    The table is filled and kept in sync by Postgres triggers (migration 0005).
+    """
+    id = models.UUIDField(primary_key=True)
+    title = models.TextField()
+    description = models.TextField(null=True)
+    creation_date = models.DateField(null=True)
+    rating = models.FloatField(null=True)
+    type = models.TextField()
+    created = models.DateTimeField(null=True)
+    modified = models.DateTimeField(null=True)
+    genres = ArrayField(models.TextField())
+    actors = ArrayField(models.TextField())
+    directors = ArrayField(models.TextField())
+    writers = ArrayField(models.TextField())
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = 'content"."film_work_read'
+
+
+class RowCount(models.Model):
+    """
+    Exact row count of a catalog table, maintained by Postgres triggers
+    (migration 0009), summed over the per-backend slots of migration 0011.
+    Read through movies.api.v1.counts. ``changes`` counts the statements that
+    changed the table (migration 0012), for the catalog ETag.
+    """
+    table_name = models.TextField(primary_key=True)
+    count = models.BigIntegerField()
+    changes = models.BigIntegerField()
+
+    class Meta:
+        managed = False
+        db_table = 'content"."row_count'
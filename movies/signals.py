@@ -0,0 +1,61 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import metrics
+from .api.v1.cache import autocomplete_cache, film_cache, genre_list_cache
+from .models import FilmWork, Genre, GenreFilmWork, Person, PersonFilmWork
+
+
+def _invalidate_films(film_work_ids):
+    # Run after commit, otherwise a concurrent request could re-cache the old rows.
+    film_work_ids = list(film_work_ids)
+    transaction.on_commit(lambda: film_cache.invalidate(film_work_ids))
+
+
+def _invalidate_genre_list():
+    transaction.on_commit(genre_list_cache.invalidate)
+
+
+def _invalidate_autocomplete(sender):
+    label = sender._meta.label
+    transaction.on_commit(lambda: autocomplete_cache.invalidate(label))
+
+
+@receiver(connection_created)
+def install_query_metrics(sender, connection, **kwargs):
+    # Connections are per thread and fire this from the thread that opens them.
+    # The wrapper list outlives reconnects, so it is only added once.
+    if metrics.execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(metrics.execute_wrapper)
+
+
+@receiver([post_save, post_delete], sender=FilmWork)
+def invalidate_film_work(sender, instance, **kwargs):
+    _invalidate_films([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=GenreFilmWork)
+@receiver([post_save, post_delete], sender=PersonFilmWork)
+def invalidate_film_work_link(sender, instance, **kwargs):
+    _invalidate_films([instance.film_work_id])
+    if sender is GenreFilmWork:
+        _invalidate_genre_list()
+
+
+@receiver([post_save, post_delete], sender=Genre)
+def invalidate_genre(sender, instance, **kwargs):
+    _invalidate_genre_list()
+    _invalidate_autocomplete(sender)
+    _invalidate_films(
+        GenreFilmWork.objects.filter(genre_id=instance.pk).values_list('film_work_id', flat=True)
+    )
+
+
+@receiver([post_save, post_delete], sender=Person)
+def invalidate_person(sender, instance, **kwargs):
+    _invalidate_autocomplete(sender)
+    _invalidate_films(
+        PersonFilmWork.objects.filter(person_id=instance.pk).values_list('film_work_id', flat=True).distinct()
+    )
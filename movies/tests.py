@@ -1,3 +1,417 @@
-from django.test import TestCase
+import io
+import json
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.exceptions import BadRequest
+from django.db import connection, transaction
+from django.http import QueryDict
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from .api.v1.cache import FilmCache, film_cache, genre_list_cache
+from .api.v1.pagination import NULL_MODIFIED, ORDERINGS, dump_token, encode_cursor
+from .api.v1.search import build_query
+from .api.v1.views import MoviesApi
+from .bulk import COLUMNS, CatalogImportError, ImportResult, import_catalog
+from .models import FilmWork, FilmWorkRead, Genre, GenreFilmWork, Person, PersonFilmWork
+
+
+class FilmWorkAdminQueriesTest(TestCase):
+    """The film admin pages run a fixed number of queries, however many links a film has."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        cls.genres = Genre.objects.bulk_create(Genre(name=f'Genre {i}') for i in range(5))
+        cls.persons = Person.objects.bulk_create(Person(full_name=f'Person {i}') for i in range(200))
+        cls.small_film = cls._create_film('Small', genres=1, actors=2)
+        cls.large_film = cls._create_film('Large', genres=5, actors=200)
+
+    @classmethod
+    def _create_film(cls, title, genres, actors):
+        film = FilmWork.objects.create(title=title, type=FilmWork.FilmWorkType.MOVIE)
+        GenreFilmWork.objects.bulk_create(GenreFilmWork(film_work=film, genre=genre) for genre in cls.genres[:genres])
+        PersonFilmWork.objects.bulk_create(
+            PersonFilmWork(film_work=film, person=person, role=PersonFilmWork.PersonRole.ACTOR)
+            for person in cls.persons[:actors]
+        )
+        return film
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        # Warm the ContentType cache, so it does not add a query to the first request only.
+        self.client.get(reverse('admin:movies_filmwork_change', args=[self.small_film.pk]))
+
+    def test_change_page_query_count_does_not_depend_on_links(self):
+        # Session, user, savepoint pair, the film and one query per inline.
+        for film, last_person in ((self.small_film, 'Person 1'), (self.large_film, 'Person 199')):
+            with self.subTest(film=film.title), self.assertNumQueries(7):
+                response = self.client.get(reverse('admin:movies_filmwork_change', args=[film.pk]))
+            self.assertContains(response, last_person)
+
+    def test_changelist_annotates_link_counts_in_one_query(self):
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('admin:movies_filmwork_changelist'))
+        self.assertContains(response, '<td class="field-genre_count">5</td><td class="field-cast_size">200</td>')
+        self.assertContains(response, '<td class="field-genre_count">1</td><td class="field-cast_size">2</td>')
+
+
+class FilmListYearFilterTest(TestCase):
+    """Years that cannot become a date range are rejected with 400, not a server error."""
+
+    @classmethod
+    def setUpTestData(cls):
+        FilmWork.objects.create(title='Old', type=FilmWork.FilmWorkType.MOVIE, creation_date='1950-06-01')
+
+    def test_out_of_range_years_are_bad_requests(self):
+        for query in ('year_to=9999', 'year_from=-3', 'year_from=99999', 'year_from=0', 'year_to=0', 'year_from=abc'):
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/v1/movies/?{query}')
+                self.assertEqual(response.status_code, 400)
+
+    def test_boundary_years_are_accepted(self):
+        response = self.client.get('/api/v1/movies/?year_from=1&year_to=9998')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Old')
+
+
+class MoviesPaginationTest(TestCase):
+    """Cursor and page modes of the film list, with ties and NULLs in the sort keys."""
+
+    @classmethod
+    def setUpTestData(cls):
+        # NULL ratings sort as NULL_RATING, so they tie with each other and with -1.0.
+        ratings = (None, None, -1.0, 5.0, 5.0, 5.0, 7.5)
+        films = FilmWork.objects.bulk_create(
+            FilmWork(title=f'Film {i}', type=FilmWork.FilmWorkType.MOVIE, rating=rating)
+            for i, rating in enumerate(ratings)
+        )
+        cls.ids = {str(film.pk) for film in films}
+        # The same for the modification time: NULL sorts as NULL_MODIFIED.
+        read_films = FilmWorkRead.objects
+        read_films.filter(pk__in=[film.pk for film in films[:3]]).update(modified=None)
+        read_films.filter(pk__in=[film.pk for film in films[3:6]]).update(modified=NULL_MODIFIED)
+        read_films.filter(pk=films[6].pk).update(modified=datetime(2000, 1, 1, tzinfo=timezone.utc))
+
+    def setUp(self):
+        patcher = mock.patch.object(MoviesApi, 'paginate_by', 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _walk(self, ordering):
+        ids, cursor = [], ''
+        while cursor is not None:
+            response = self.client.get(f'/api/v1/movies/?fields=id&ordering={ordering}&cursor={cursor}')
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            self.assertLessEqual(len(page['results']), 2)
+            ids.extend(film['id'] for film in page['results'])
+            cursor = page['next_cursor']
+        return ids
+
+    def test_cursor_walk_returns_every_film_once(self):
+        for ordering in ORDERINGS:
+            with self.subTest(ordering=ordering):
+                ids = self._walk(ordering)
+                self.assertEqual(len(ids), len(self.ids))
+                self.assertEqual(set(ids), self.ids)
+
+    def test_invalid_or_tampered_cursors_are_bad_requests(self):
+        valid = encode_cursor('rating', 5.0, uuid.uuid4())
+        for ordering, cursor in (
+            ('rating', 'not-a-cursor'),
+            ('rating', dump_token(['rating', 5.0])),
+            ('rating', dump_token(['rating', 'high', str(uuid.uuid4())])),
+            ('rating', dump_token(['rating', 5.0, 'not-a-uuid'])),
+            ('-rating', valid),
+            ('modified', encode_cursor('modified', 5.0, uuid.uuid4())),
+        ):
+            with self.subTest(ordering=ordering, cursor=cursor):
+                response = self.client.get(f'/api/v1/movies/?ordering={ordering}&cursor={cursor}')
+                self.assertEqual(response.status_code, 400)
+                self.assertTrue(response.json()['error'])
+        response = self.client.get(f'/api/v1/movies/?ordering=rating&cursor={valid}')
+        self.assertEqual(response.status_code, 200)
+
+    def test_out_of_range_pages_are_not_found(self):
+        self.assertEqual(self.client.get('/api/v1/movies/?page=4').status_code, 200)
+        for page in ('5', '0', '-1', '100'):
+            with self.subTest(page=page):
+                self.assertEqual(self.client.get(f'/api/v1/movies/?page={page}').status_code, 404)
+
+
+class MoviesExportSnapshotTest(TransactionTestCase):
+    """An export started from the snapshot of the previous one returns exactly the films changed since."""
+
+    def _export(self, query=''):
+        response = self.client.get(f'/api/v1/movies/export/?fields=title&include={query}')
+        self.assertEqual(response.status_code, 200)
+        titles = sorted(line for line in b''.join(response.streaming_content).decode().splitlines())
+        return response['X-Export-Snapshot'], titles
+
+    def test_since_snapshot_returns_films_changed_after_the_export(self):
+        FilmWork.objects.create(title='Kept', type=FilmWork.FilmWorkType.MOVIE)
+        changed = FilmWork.objects.create(title='Changed', type=FilmWork.FilmWorkType.MOVIE)
+        snapshot, titles = self._export()
+        self.assertEqual(len(titles), 2)
+
+        changed.title = 'Changed again'
+        changed.save()
+        snapshot, titles = self._export(f'&since_snapshot={snapshot}')
+        self.assertEqual(len(titles), 1)
+        self.assertIn('Changed again', titles[0])
+        self.assertEqual(self._export(f'&since_snapshot={snapshot}')[1], [])
+
+    def test_invalid_snapshots_are_bad_requests(self):
+        for snapshot in ('abc', '0:5:', '10:20:15,12', '10:20:9', '1:9223372036854775808:'):
+            with self.subTest(snapshot=snapshot):
+                response = self.client.get(f'/api/v1/movies/export/?since_snapshot={snapshot}')
+                self.assertEqual(response.status_code, 400)
+
+
+class CatalogImportTest(TestCase):
+    """import_catalog merges NDJSON and CSV files into the content tables and film_work_read."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.drama = Genre.objects.create(name='Drama')
+        cls.western = Genre.objects.create(name='Western')
+        cls.old_actor = Person.objects.create(full_name='Old Actor')
+        cls.kept_actor = Person.objects.create(full_name='Kept Actor')
+        cls.film = FilmWork.objects.create(title='Before', type=FilmWork.FilmWorkType.MOVIE)
+        GenreFilmWork.objects.bulk_create(
+            GenreFilmWork(film_work=cls.film, genre=genre) for genre in (cls.drama, cls.western)
+        )
+        PersonFilmWork.objects.bulk_create(
+            PersonFilmWork(film_work=cls.film, person=person, role=PersonFilmWork.PersonRole.ACTOR)
+            for person in (cls.old_actor, cls.kept_actor)
+        )
+        cls.new_id = uuid.uuid4()
+
+    def _import(self, lines, file_format):
+        return import_catalog(io.BytesIO('\n'.join(lines).encode()), file_format)
+
+    def _ndjson(self):
+        return [
+            json.dumps({
+                'id': str(self.film.pk), 'title': 'After', 'type': 'movie', 'rating': 8.5,
+                'genres': ['Drama', 'Comedy'], 'actors': ['Kept Actor', 'New Actor'], 'directors': ['New Actor'],
+            }),
+            '',
+            json.dumps({
+                'id': str(self.new_id), 'title': 'New', 'type': 'tv_show', 'creation_date': '2001-02-03',
+                'genres': ['Comedy'], 'writers': ['Writer'],
+            }),
+        ]
+
+    def _csv(self):
+        return [
+            ','.join(COLUMNS),
+            f'{self.film.pk},After,,,8.5,movie,Drama|Comedy,Kept Actor|New Actor,New Actor,',
+            f'{self.new_id},New,,2001-02-03,,tv_show,Comedy,,,Writer',
+        ]
+
+    def _links(self, film_id):
+        genres = set(GenreFilmWork.objects.filter(film_work_id=film_id).values_list('genre__name', flat=True))
+        persons = set(PersonFilmWork.objects.filter(film_work_id=film_id).values_list('person__full_name', 'role'))
+        return genres, persons
+
+    def test_files_are_merged(self):
+        for file_format, lines in (('ndjson', self._ndjson), ('csv', self._csv)):
+            with self.subTest(file_format=file_format), transaction.atomic():
+                result = self._import(lines(), file_format)
+                self.assertEqual(result, ImportResult(films=2, created_films=1, created_genres=1, created_persons=2))
+
+                self.assertEqual(FilmWork.objects.get(pk=self.film.pk).rating, 8.5)
+                self.assertEqual(self._links(self.film.pk), (
+                    {'Drama', 'Comedy'},
+                    {('Kept Actor', 'actor'), ('New Actor', 'actor'), ('New Actor', 'director')},
+                ))
+                self.assertEqual(self._links(self.new_id), ({'Comedy'}, {('Writer', 'writer')}))
+                self.assertEqual(Genre.objects.filter(name='Comedy').count(), 1)
+                self.assertEqual(Person.objects.filter(full_name='New Actor').count(), 1)
+
+                film = FilmWorkRead.objects.get(pk=self.film.pk)
+                self.assertEqual((film.title, film.rating), ('After', 8.5))
+                self.assertCountEqual(film.genres, ['Drama', 'Comedy'])
+                self.assertCountEqual(film.actors, ['Kept Actor', 'New Actor'])
+                self.assertEqual((film.directors, film.writers), (['New Actor'], []))
+                film = FilmWorkRead.objects.get(pk=self.new_id)
+                self.assertEqual((film.title, film.type, film.creation_date), ('New', 'tv_show', date(2001, 2, 3)))
+                self.assertEqual((film.genres, film.actors, film.writers), (['Comedy'], [], ['Writer']))
+                # Roll the import back for the next format; the staging tables only go on commit.
+                transaction.set_rollback(True)
+
+    def test_invalid_lines_are_reported_and_nothing_is_imported(self):
+        lines = [
+            json.dumps({'title': 'Fine', 'type': 'movie'}),
+            '{"title": ',
+            json.dumps({'title': '', 'type': 'movie'}),
+            json.dumps({'id': str(self.film.pk), 'title': 'After', 'type': 'movie', 'rating': 11}),
+            json.dumps({'id': str(self.film.pk), 'title': 'After', 'type': 'movie'}),
+            json.dumps({'id': str(self.film.pk), 'title': 'Again', 'type': 'movie'}),
+            json.dumps({'title': 'Odd', 'type': 'play', 'actors': 'Old Actor'}),
+        ]
+        with self.assertRaises(CatalogImportError) as raised:
+            self._import(lines, 'ndjson')
+        self.assertEqual(len(raised.exception.errors), 5)
+        for number, message in zip((2, 3, 4, 6, 7), raised.exception.errors):
+            self.assertTrue(message.startswith(f'line {number}: '), message)
+        self.assertIn('title is required', raised.exception.errors[1])
+        self.assertIn('out of the 0-10 range', raised.exception.errors[2])
+        self.assertIn('is listed twice', raised.exception.errors[3])
+
+        self.assertEqual(FilmWork.objects.count(), 1)
+        self.assertEqual(FilmWorkRead.objects.get(pk=self.film.pk).title, 'Before')
+        self.assertFalse(Person.objects.filter(full_name='New Actor').exists())
+
+        with self.assertRaises(CatalogImportError) as raised:
+            self._import([','.join(COLUMNS), f'{self.new_id},New,,03.02.2001,,movie,,,,'], 'csv')
+        self.assertEqual(raised.exception.errors, [
+            "line 2: invalid creation_date '03.02.2001', expected YYYY-MM-DD",
+        ])
+
+    def test_caches_are_invalidated_on_commit(self):
+        last_modified = FilmWorkRead.objects.get(pk=self.film.pk).updated_at
+        film_cache.set(self.film.pk, b'{}', last_modified, film_cache.generation)
+        genres_generation = genre_list_cache.generation
+        with self.captureOnCommitCallbacks(execute=True):
+            self._import(self._ndjson(), 'ndjson')
+            self.assertEqual(film_cache.get(self.film.pk, last_modified), b'{}')
+        self.assertIsNone(film_cache.get(self.film.pk, last_modified))
+        self.assertGreater(genre_list_cache.generation, genres_generation)
+
+
+class FilmDetailValidatorsTest(TestCase):
+    """The detail validators follow the row, not the worker's cache entry."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.film = FilmWork.objects.create(title='Before', type=FilmWork.FilmWorkType.MOVIE)
+
+    def test_write_that_skips_the_cache_invalidation_is_served(self):
+        url = f'/api/v1/movies/{self.film.pk}/'
+        first = self.client.get(url)
+        self.assertContains(first, 'Before')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+        # Another worker's edit: this worker's film_cache is not invalidated.
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE content.film_work SET title = 'After' WHERE id = %s", [self.film.pk])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'After')
+        self.assertNotEqual(response['ETag'], first['ETag'])
+
+    def test_unknown_film_is_not_found(self):
+        response = self.client.get(f'/api/v1/movies/{uuid.uuid4()}/')
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'film-cache-test'},
+})
+class FilmCacheTest(SimpleTestCase):
+    """Entries are tied to the updated_at they were built from, in both levels."""
+
+    def setUp(self):
+        caches['shared'].clear()
+        self.pk = uuid.uuid4()
+        self.old = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.new = self.old + timedelta(seconds=1)
+
+    def _cache(self):
+        return FilmCache(max_entries=10, ttl=60, backend='shared', shared_ttl=60)
+
+    def test_entries_are_served_for_their_updated_at_only(self):
+        cache = self._cache()
+        cache.set(self.pk, b'old', self.old, cache.generation)
+        self.assertEqual(cache.get(self.pk, self.old), b'old')
+        self.assertIsNone(cache.get(self.pk, self.new))
+
+    def test_read_from_before_an_invalidation_is_not_stored(self):
+        cache = self._cache()
+        generation = cache.generation
+        cache.invalidate([self.pk])
+        cache.set(self.pk, b'old', self.old, generation)
+        self.assertIsNone(cache.get(self.pk, self.old))
+
+    def test_another_worker_cannot_put_an_old_read_back(self):
+        writer, reader = self._cache(), self._cache()
+        # The reader read the film before the write and stores it afterwards.
+        reader.set(self.pk, b'old', self.old, reader.generation)
+        writer.invalidate([self.pk])
+        writer.set(self.pk, b'new', self.new, writer.generation)
+        reader.set(self.pk, b'old', self.old, reader.generation)
+        self.assertEqual(self._cache().get(self.pk, self.new), b'new')
+        self.assertEqual(reader.get(self.pk, self.new), b'new')
+
+
+class ApiErrorTest(TestCase):
+    """Invalid API parameters are answered with a JSON error body."""
+
+    def test_bad_parameters_are_json_errors(self):
+        for url in (
+            '/api/v1/movies/?ids=abc',
+            '/api/v1/movies/?fields=nope',
+            '/api/v1/movies/export/?since_snapshot=abc',
+            '/api/v1/movies/?cursor=abc',
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response['Content-Type'], 'application/json')
+                self.assertTrue(response.json()['error'])
+
+    def test_message_names_the_parameter(self):
+        response = self.client.get('/api/v1/movies/?ids=abc')
+        self.assertEqual(response.json(), {'error': "Invalid id 'abc', expected a UUID"})
+
+    def test_other_pages_keep_the_html_error(self):
+        response = self.client.get('/admin/', HTTP_HOST='bad host')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response['Content-Type'].startswith('text/html'))
+
+
+class SearchQueryTest(SimpleTestCase):
+    """Search parameters mean the same as on the film list."""
+
+    def test_genre_is_an_id_and_genre_name_a_name(self):
+        genre = uuid.uuid4()
+        query = build_query(QueryDict(f'genre={genre}&genre_name=Drama'))
+        self.assertEqual(query['bool']['filter'], [
+            {'term': {'genre_ids': str(genre)}},
+            {'term': {'genres': 'Drama'}},
+        ])
+
+    def test_invalid_genre_is_a_bad_request(self):
+        with self.assertRaises(BadRequest):
+            build_query(QueryDict('genre=Drama'))
+
+    def test_empty_values_are_ignored(self):
+        query = build_query(QueryDict('genre=&person=&rating_min=&rating_max='))
+        self.assertEqual(query['bool']['filter'], [])
+
+
+@override_settings(MOVIES_API_QUERY_BUDGET=0)
+class QueryBudgetTest(TestCase):
+    """The query budget is checked for the API routes only."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def test_api_requests_over_budget_are_logged(self):
+        with self.assertLogs('movies.middleware', 'WARNING'):
+            self.client.get('/api/v1/movies/')
+
+    def test_admin_requests_are_not_budgeted(self):
+        self.client.force_login(self.user)
+        with self.assertNoLogs('movies.middleware', 'WARNING'):
+            response = self.client.get(reverse('admin:movies_filmwork_changelist'))
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,12 @@
+#!/bin/sh
+
+# Прерывать выполнение скрипта при любой ошибке
+set -e
+
+# Компиляция переводов
+echo "Compiling translations..."
+python manage.py compilemessages --ignore venv
+
+# Запуск ASGI-сервера: список и карточка фильма обслуживаются async-представлениями
+echo "Starting ASGI server..."
+exec uvicorn config.asgi:application --host 0.0.0.0 --port "${ASGI_PORT:-8000}" --workers "${ASGI_WORKERS:-4}"
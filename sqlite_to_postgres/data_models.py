@@ -1,11 +1,18 @@
 import logging
 from dataclasses import dataclass, fields
-from datetime import date, datetime
+from datetime import date, datetime, timezone
+from operator import itemgetter
+from typing import Callable
 from uuid import UUID
 import functools
 
 logger = logging.getLogger(__name__)
 
+# Placeholders that exports use instead of NULL in optional columns.
+NULL_MARKERS = frozenset({'', 'N/A', 'n/a', 'NULL', 'null', 'None'})
+# Parsed UUIDs kept per reference field (film_work_id, person_id, ...).
+REFERENCE_CACHE_SIZE = 2 ** 16
+
 
 @functools.lru_cache
 def _parse_datetime(value: str) -> datetime | None:
@@ -20,9 +27,9 @@ def _parse_datetime(value: str) -> datetime | None:
 
     # Try the standard and fast ISO 8601 format first
     try:
-        return datetime.fromisoformat(dt_value)
+        parsed = datetime.fromisoformat(dt_value)
     except ValueError:
-        pass
+        parsed = None
 
     # If that fails, try a list of common formats
     formats_to_try = [
@@ -30,52 +37,133 @@ def _parse_datetime(value: str) -> datetime | None:
         '%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%d %H:%M:%S',
     ]
     for fmt in formats_to_try:
+        if parsed is not None:
+            break
         try:
-            return datetime.strptime(dt_value, fmt)
+            parsed = datetime.strptime(dt_value, fmt)
         except ValueError:
             continue
-    return None
+
+    # Timestamps without an offset were written in UTC; keep them comparable
+    # with the timestamptz values read back from PostgreSQL.
+    if parsed is not None and parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _to_uuid(value):
+    return UUID(value) if isinstance(value, str) else value
+
+
+def _to_datetime(value):
+    if not isinstance(value, str):
+        return value
+    parsed = _parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f"Could not parse datetime string '{value}'")
+    return parsed
 
 
-@dataclass
+def _to_date(value):
+    if not isinstance(value, str):
+        return value
+    # fromisoformat is much faster and agrees with strptime on zero-padded dates.
+    if len(value) == 10 and value[4] == value[7] == '-':
+        return date.fromisoformat(value)
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def _to_float(value):
+    if isinstance(value, float):
+        return value
+    if isinstance(value, str):
+        # Decimal commas ('7,5') come from spreadsheet round trips.
+        return float(value.strip().replace(',', '.'))
+    return float(value)
+
+
+_CONVERTERS = {UUID: _to_uuid, datetime: _to_datetime, date: _to_date, float: _to_float}
+
+
+def _field_converter(field_type) -> Callable | None:
+    """Returns the conversion for a field annotation, or None when values are kept as they are."""
+    if not hasattr(field_type, '__args__'):
+        return _CONVERTERS.get(field_type)
+    # Handles Optional[T] which is Union[T, None]; optional fields also accept the NULL markers.
+    actual_types = [t for t in field_type.__args__ if t is not type(None)]
+    convert = _CONVERTERS.get(actual_types[0]) if len(actual_types) == 1 else None
+
+    def convert_optional(value):
+        if isinstance(value, str) and value.strip() in NULL_MARKERS:
+            return None
+        return convert(value) if convert else value
+    return convert_optional
+
+
+@functools.cache
+def _field_converters(data_class: type) -> tuple[tuple[str, Callable], ...]:
+    """The (field name, conversion) pairs of a dataclass, resolved from its annotations once."""
+    converters = []
+    for field in fields(data_class):
+        convert = _field_converter(field.type)
+        if convert is _to_uuid and field.name.endswith('_id'):
+            # References repeat on every link row of a film or person; parsing a UUID
+            # string costs far more than the lookup. Each field gets its own cache.
+            convert = functools.lru_cache(maxsize=REFERENCE_CACHE_SIZE)(_to_uuid)
+        if convert is not None:
+            converters.append((field.name, convert))
+    return tuple(converters)
+
+
+@dataclass(slots=True)
 class BaseDataClass:
     """A base class for dataclasses that handles common type conversions."""
     def __post_init__(self):
-        for field in fields(self):
-            value = getattr(self, field.name)
+        for name, convert in _field_converters(type(self)):
+            value = getattr(self, name)
             if value is None:
                 continue
-
-            # Get the actual type for Union types like `str | None`
-            field_type = field.type
-            if hasattr(field_type, '__args__'):
-                # Handles Optional[T] which is Union[T, None]
-                actual_types = [t for t in field_type.__args__ if t is not type(None)]
-                if len(actual_types) == 1:
-                    field_type = actual_types[0]
-
             try:
-                if field_type == UUID and isinstance(value, str):
-                    setattr(self, field.name, UUID(value))
-                elif field_type == datetime and isinstance(value, str):
-                    parsed_dt = _parse_datetime(value)
-                    if parsed_dt:
-                        setattr(self, field.name, parsed_dt)
-                    else:
-                        raise ValueError(f"Could not parse datetime string '{value}'")
-                elif field_type == date and isinstance(value, str):
-                    setattr(self, field.name, datetime.strptime(value, '%Y-%m-%d').date())
-                elif field_type == float and not isinstance(value, float):
-                    setattr(self, field.name, float(value))
+                converted = convert(value)
             except (ValueError, TypeError) as e:
                 logger.warning(
-                    f"Could not convert value '{value}' for field '{field.name}' in {self.__class__.__name__}"
-                    f"(id={getattr(self, 'id', 'N/A')}). Error: {e}. Setting to None."
+                    "Could not convert value '%s' for field '%s' in %s(id=%s). Error: %s. Setting to None.",
+                    value, name, type(self).__name__, getattr(self, 'id', 'N/A'), e,
                 )
-                setattr(self, field.name, None)
-
-
-@dataclass
+                converted = None
+            if converted is not value:
+                setattr(self, name, converted)
+
+
+@functools.cache
+def row_converter(data_class: type, source_columns: tuple[str, ...],
+                  column_mappings: tuple[tuple[str, str], ...] = (),
+                  columns_to_drop: tuple[str, ...] = ()) -> Callable:
+    """
+    Returns a function that builds a ``data_class`` instance from one source
+    row (anything indexable by position, such as sqlite3.Row) with the given
+    column layout. Renames and drops are resolved to positions here, once per
+    layout, instead of remapping a dict for every row.
+    """
+    mappings = dict(column_mappings)
+    positions = {}
+    for index, column in enumerate(source_columns):
+        column = mappings.get(column, column)
+        if column not in columns_to_drop:
+            positions[column] = index
+    field_names = [field.name for field in fields(data_class)]
+    missing = [name for name in field_names if name not in positions]
+    unexpected = [column for column in positions if column not in field_names]
+    if missing or unexpected:
+        raise TypeError(
+            f"Source columns {source_columns} do not match {data_class.__name__}: "
+            f"missing {missing}, unexpected {unexpected}"
+        )
+    values = itemgetter(*(positions[name] for name in field_names))
+    return lambda row: data_class(*values(row))
+
+
+@dataclass(slots=True)
 class FilmWork(BaseDataClass):
     id: UUID
     title: str
@@ -87,7 +175,7 @@ class FilmWork(BaseDataClass):
     modified: datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class Person(BaseDataClass):
     id: UUID
     full_name: str
@@ -95,7 +183,7 @@ class Person(BaseDataClass):
     modified: datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class Genre(BaseDataClass):
     id: UUID
     name: str
@@ -104,7 +192,7 @@ class Genre(BaseDataClass):
     modified: datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class GenreFilmWork(BaseDataClass):
     id: UUID
     film_work_id: UUID
@@ -112,7 +200,7 @@ class GenreFilmWork(BaseDataClass):
     created: datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class PersonFilmWork(BaseDataClass):
     id: UUID
     film_work_id: UUID
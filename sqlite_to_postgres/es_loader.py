@@ -66,7 +66,9 @@ class ElasticsearchLoader:
                     "properties": {
                         "id": {"type": "keyword"},
                         "imdb_rating": {"type": "float"},
+                        "type": {"type": "keyword"},
                         "genres": {"type": "keyword"},
+                        "genre_ids": {"type": "keyword"},
                         "title": {"type": "text", "analyzer": "ru_en", "fields": {"raw": {"type": "keyword"}}},
                         "description": {"type": "text", "analyzer": "ru_en"},
                         "directors_names": {"type": "text", "analyzer": "ru_en"},
@@ -90,6 +92,11 @@ class ElasticsearchLoader:
             self.es_client.indices.create(index=index_name, body=body)
         else:
             logger.info(f"Elasticsearch index '{index_name}' already exists.")
+            # The mapping is strict, so fields added later must be put explicitly
+            # before documents carrying them can be indexed into an old index.
+            self.es_client.indices.put_mapping(
+                index=index_name, properties={"type": {"type": "keyword"}, "genre_ids": {"type": "keyword"}},
+            )
 
     def get_enriched_data_from_pg(self, film_work_ids: Tuple[str]) -> List[Dict]:
         """
@@ -126,7 +133,7 @@ class ElasticsearchLoader:
 
         # Группировка данных
         film_works = defaultdict(lambda: {
-            "id": None, "title": None, "description": None, "imdb_rating": None,
+            "id": None, "title": None, "description": None, "imdb_rating": None, "type": None,
             "genres": set(), "directors": set(), "actors": set(), "writers": set()
         })
 
@@ -136,6 +143,7 @@ class ElasticsearchLoader:
             film_works[fw_id]['title'] = row[1]
             film_works[fw_id]['description'] = row[2]
             film_works[fw_id]['imdb_rating'] = row[3]
+            film_works[fw_id]['type'] = row[4]
             if row[8] and row[9]: # person_id, person_name
                 film_works[fw_id][f"{row[7]}s"].add((str(row[8]), row[9]))
             if row[10] and row[11]: # genre_id, genre_name
@@ -149,7 +157,8 @@ class ElasticsearchLoader:
             if data.get('description') == 'N/A':
                 data['description'] = None
 
-            data['genres'] = [gname for _, gname in data['genres']] if data['genres'] else []
+            data['genre_ids'] = [gid for gid, _ in data['genres']]
+            data['genres'] = [gname for _, gname in data['genres']]
             data['directors'] = [{'id': pid, 'name': pname} for pid, pname in data['directors']]
             data['actors'] = [{'id': pid, 'name': pname} for pid, pname in data['actors']]
             data['writers'] = [{'id': pid, 'name': pname} for pid, pname in data['writers']]
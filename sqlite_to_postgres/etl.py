@@ -1,43 +1,47 @@
 import logging
 import sqlite3
 from dataclasses import astuple
-from typing import Generator
+from operator import attrgetter
+from typing import Generator, Iterable
 
 import psycopg
 from psycopg.sql import SQL, Identifier
 
+from .data_models import row_converter
 from .settings import BATCH_SIZE, TABLE_CONFIGS
 
 logger = logging.getLogger(__name__)
 
 
-def extract_sqlite_data(sqlite_cursor: sqlite3.Cursor, table_name: str) -> Generator[list[sqlite3.Row], None, None]:
-    """Extracts data from an SQLite table in batches."""
+def extract_sqlite_data(sqlite_cursor: sqlite3.Cursor, table_name: str, rowid_range: tuple[int, int] | None = None) -> Generator[list[sqlite3.Row], None, None]:
+    """Extracts data from an SQLite table in batches, optionally only the rows with first < rowid <= last."""
     logger.info(f"Extracting data from SQLite table: {table_name}")
-    sqlite_cursor.execute(f"SELECT * FROM {table_name}")
+    if rowid_range is None:
+        sqlite_cursor.execute(f"SELECT * FROM {table_name}")
+    else:
+        sqlite_cursor.execute(f"SELECT * FROM {table_name} WHERE rowid > ? AND rowid <= ? ORDER BY rowid", rowid_range)
     while results := sqlite_cursor.fetchmany(BATCH_SIZE):
         yield results
 
 
 def transform_to_dataclass(batch: list[sqlite3.Row], config: dict) -> list:
     """Transforms a batch of SQLite rows to a list of dataclass instances."""
-    data_class = config["dataclass"]
-    column_mappings = config.get("column_mappings", {})
-    columns_to_drop = config.get("columns_to_drop", [])
+    if not batch:
+        return []
+    # Declarative mappings and drops from settings, resolved once per column layout
+    make_record = row_converter(
+        config["dataclass"],
+        tuple(batch[0].keys()),
+        tuple(config.get("column_mappings", {}).items()),
+        tuple(config.get("columns_to_drop", ())),
+    )
 
     transformed_batch = []
     for row_num, row_data in enumerate(batch):
-        mapped_row_data = dict(row_data)
-        # Apply declarative mappings and drops from settings
-        for source_col, target_col in column_mappings.items():
-            if source_col in mapped_row_data:
-                mapped_row_data[target_col] = mapped_row_data.pop(source_col)
-        for col_to_drop in columns_to_drop:
-            mapped_row_data.pop(col_to_drop, None)
         try:
-            transformed_batch.append(data_class(**mapped_row_data))
+            transformed_batch.append(make_record(row_data))
         except Exception as e:
-            logger.error(f"Error transforming row #{row_num} for {data_class.__name__}: {mapped_row_data}. Original SQLite row: {dict(row_data)}. Error: {e}", exc_info=True)
+            logger.error(f"Error transforming row #{row_num} for {config['dataclass'].__name__}. Original SQLite row: {dict(row_data)}. Error: {e}", exc_info=True)
     return transformed_batch
 
 
@@ -67,6 +71,61 @@ def load_to_postgres(pg_cursor: psycopg.Cursor, table_name: str, columns: list[s
         raise
 
 
+def copy_to_postgres(pg_cursor: psycopg.Cursor, table_name: str, columns: list[str], batches: Iterable[list], conflict_target: str = "id") -> int:
+    """
+    Streams all batches of a table into a temporary staging table with COPY and
+    merges it into the target with one INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+    Returns the number of rows inserted.
+    """
+    schema, _, table = table_name.rpartition('.')
+    target = Identifier(schema, table) if schema else Identifier(table)
+    staging_table = f"{table}_staging"
+    staging = Identifier(staging_table)
+    cols = SQL(', ').join(map(Identifier, columns))
+    # astuple() deep-copies every value, which costs more than the COPY itself.
+    row_values = attrgetter(*columns)
+
+    try:
+        pg_cursor.execute(SQL("DROP TABLE IF EXISTS {staging}").format(staging=staging))
+        # LIKE copies the column types, but not the constraints: duplicates are
+        # resolved by the merge, exactly as the INSERT path does.
+        pg_cursor.execute(SQL("CREATE TEMPORARY TABLE {staging} (LIKE {target}) ON COMMIT DROP").format(
+            staging=staging, target=target,
+        ))
+        staged = 0
+        with pg_cursor.copy(SQL("COPY {staging} ({cols}) FROM STDIN").format(staging=staging, cols=cols)) as copy:
+            for batch in batches:
+                for item in batch:
+                    copy.write_row(row_values(item))
+                staged += len(batch)
+        logger.info(f"Staged {staged} rows for PostgreSQL table: {table_name}")
+    except psycopg.Error as e:
+        logger.error(f"PostgreSQL error copying data into {table_name}. Error: {e}", exc_info=True)
+        raise
+    return merge_into_postgres(pg_cursor, table_name, staging_table, columns, conflict_target)
+
+
+def merge_into_postgres(pg_cursor: psycopg.Cursor, table_name: str, source_table: str, columns: list[str], conflict_target: str = "id") -> int:
+    """
+    Inserts the rows of ``source_table`` into ``table_name`` with one
+    INSERT ... SELECT ... ON CONFLICT DO NOTHING. Returns the number of rows inserted.
+    """
+    cols = SQL(', ').join(map(Identifier, columns))
+    query = SQL("INSERT INTO {target} ({cols}) SELECT {cols} FROM {source} ON CONFLICT ({conflict_cols}) DO NOTHING").format(
+        target=Identifier(*table_name.split('.')),
+        cols=cols,
+        source=Identifier(*source_table.split('.')),
+        conflict_cols=SQL(', ').join(map(Identifier, conflict_target.replace(' ', '').split(','))),
+    )
+    try:
+        pg_cursor.execute(query)
+    except psycopg.Error as e:
+        logger.error(f"PostgreSQL error merging {source_table} into {table_name}. Error: {e}", exc_info=True)
+        raise
+    logger.info(f"Merged {pg_cursor.rowcount} new rows from {source_table} into PostgreSQL table: {table_name}")
+    return pg_cursor.rowcount
+
+
 def test_data_transfer(sqlite_cursor: sqlite3.Cursor, pg_cursor: psycopg.Cursor, pg_table_name: str, sqlite_table_name: str, config: dict):
     """Tests data transfer by comparing row counts and a sample of data."""
     logger.info(f"Starting data transfer test for table: {pg_table_name}")
@@ -12,7 +12,6 @@ from .logging_config import setup_logging
 from .settings import BATCH_SIZE, ETL_SLEEP_INTERVAL
 from .state import JsonFileStorage, State
 
-setup_logging()
 logger = logging.getLogger(__name__)
 
 
@@ -144,4 +143,6 @@ def main(pg_dsl: dict):
 
 if __name__ == "__main__":
     from .settings import get_pg_dsl
+    # Importing the module (run_etl, benchmarks) must not configure logging.
+    setup_logging()
     main(get_pg_dsl())
\ No newline at end of file
@@ -0,0 +1,224 @@
+"""
+Generates a synthetic SQLite source database for migration-scale testing.
+
+    python -m sqlite_to_postgres.generate_sqlite --films 1000000 --output /tmp/movies.sqlite
+
+The file has the same schema as the bundled db.sqlite (``created_at``/
+``updated_at`` columns, ``file_path`` on film_work), so load_data can migrate
+it with SQLITE_DB_PATH pointing at it. A share of the rows (``--dirty-ratio``)
+carries the kind of dirt BaseDataClass.__post_init__ has to repair: odd
+datetime formats, 'N/A' or empty descriptions and ratings, ratings stored as
+strings with a decimal comma. (Numeric strings such as '7.5' would be turned
+into REAL by the FLOAT column affinity, so they cannot be stored as text.)
+The output is deterministic for a given ``--seed``.
+"""
+import argparse
+import logging
+import random
+import sqlite3
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from pathlib import Path
+
+from .logging_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE film_work (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT,
+    creation_date DATE,
+    file_path TEXT,
+    rating FLOAT,
+    type TEXT NOT NULL,
+    created_at timestamp with time zone,
+    updated_at timestamp with time zone
+);
+CREATE TABLE genre (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT,
+    created_at timestamp with time zone,
+    updated_at timestamp with time zone
+);
+CREATE TABLE person (
+    id TEXT PRIMARY KEY,
+    full_name TEXT NOT NULL,
+    created_at timestamp with time zone,
+    updated_at timestamp with time zone
+);
+CREATE TABLE genre_film_work (
+    id TEXT PRIMARY KEY,
+    film_work_id TEXT NOT NULL,
+    genre_id TEXT NOT NULL,
+    created_at timestamp with time zone
+);
+CREATE UNIQUE INDEX film_work_genre ON genre_film_work (film_work_id, genre_id);
+CREATE TABLE person_film_work (
+    id TEXT PRIMARY KEY,
+    film_work_id TEXT NOT NULL,
+    person_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    created_at timestamp with time zone
+);
+CREATE UNIQUE INDEX film_work_person_role ON person_film_work (film_work_id, person_id, role);
+"""
+
+GENRES = (
+    'Action', 'Adventure', 'Animation', 'Biography', 'Comedy', 'Crime', 'Documentary', 'Drama',
+    'Family', 'Fantasy', 'History', 'Horror', 'Music', 'Musical', 'Mystery', 'News', 'Reality-TV',
+    'Romance', 'Sci-Fi', 'Short', 'Sport', 'Talk-Show', 'Thriller', 'War', 'Western', 'Game-Show',
+)
+SYLLABLES = ('ka', 'lo', 'mi', 'ra', 'ven', 'tor', 'an', 'el', 'is', 'dor', 'mar', 'sin', 'qu', 'bel', 'ro')
+WORDS = (
+    'the', 'of', 'night', 'star', 'return', 'last', 'city', 'love', 'war', 'dark', 'secret', 'king',
+    'river', 'road', 'house', 'dream', 'fire', 'shadow', 'summer', 'ghost', 'blood', 'light', 'man',
+)
+ROLES = (('actor', 3, 15), ('director', 1, 2), ('writer', 1, 3))
+INSERT_BATCH_SIZE = 10_000
+
+# Formats seen in real exports; all of them are understood by data_models._parse_datetime.
+CLEAN_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f+00'
+DIRTY_DATETIME_FORMATS = (
+    '%Y-%m-%dT%H:%M:%S.%fZ',
+    '%Y-%m-%dT%H:%M:%S+00:00',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%d %H:%M:%S+0000',
+)
+
+
+class SqliteSourceGenerator:
+    def __init__(self, films: int, dirty_ratio: float, seed: int):
+        self.films = films
+        self.dirty_ratio = dirty_ratio
+        self.rng = random.Random(seed)
+        self.start = datetime(2021, 6, 16, tzinfo=timezone.utc)
+        self.genre_ids = [self._uuid() for _ in GENRES]
+        self.person_ids = [self._uuid() for _ in range(max(films // 2, 10))]
+        # Long-tailed popularity: a few persons appear in thousands of films, most in a handful.
+        self.person_weights = list(accumulate(self.rng.paretovariate(2.0) for _ in self.person_ids))
+        self.genre_weights = list(accumulate(1 / (rank + 1) for rank in range(len(GENRES))))
+
+    def _uuid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def _dirty(self) -> bool:
+        return self.rng.random() < self.dirty_ratio
+
+    def _timestamp(self) -> str:
+        value = self.start + timedelta(seconds=self.rng.randint(0, 3 * 365 * 86400), microseconds=self.rng.randint(0, 999999))
+        if self._dirty():
+            return value.strftime(self.rng.choice(DIRTY_DATETIME_FORMATS))
+        return value.strftime(CLEAN_DATETIME_FORMAT)
+
+    def _name(self) -> str:
+        return ' '.join(''.join(self.rng.choices(SYLLABLES, k=self.rng.randint(2, 3))).capitalize() for _ in range(2))
+
+    def _sentence(self, words: int) -> str:
+        return ' '.join(self.rng.choices(WORDS, k=words)).capitalize()
+
+    def _description(self) -> str | None:
+        if self._dirty():
+            return self.rng.choice(('N/A', '', None))
+        return self._sentence(self.rng.randint(10, 60))
+
+    def _rating(self):
+        rating = round(self.rng.uniform(1, 10), 1)
+        if self._dirty():
+            return self.rng.choice((str(rating).replace('.', ','), 'N/A', None))
+        return rating
+
+    def genres(self):
+        for genre_id, name in zip(self.genre_ids, GENRES):
+            yield genre_id, name, self._description(), self._timestamp(), self._timestamp()
+
+    def persons(self):
+        for person_id in self.person_ids:
+            yield person_id, self._name(), self._timestamp(), self._timestamp()
+
+    def films_with_links(self):
+        """Yields (film row, genre link rows, person link rows) per film."""
+        rng = self.rng
+        for _ in range(self.films):
+            film_id = self._uuid()
+            creation_date = (self.start.date() - timedelta(days=rng.randint(0, 36000))).isoformat()
+            film = (
+                film_id,
+                self._sentence(rng.randint(1, 5)),
+                self._description(),
+                creation_date if rng.random() > 0.05 else None,
+                None,
+                self._rating(),
+                'movie' if rng.random() < 0.8 else 'tv_show',
+                self._timestamp(),
+                self._timestamp(),
+            )
+            genres = set(rng.choices(self.genre_ids, cum_weights=self.genre_weights, k=rng.randint(1, 3)))
+            genre_links = [(self._uuid(), film_id, genre_id, self._timestamp()) for genre_id in genres]
+            person_links = []
+            for role, low, high in ROLES:
+                persons = set(rng.choices(self.person_ids, cum_weights=self.person_weights, k=rng.randint(low, high)))
+                person_links.extend((self._uuid(), film_id, person_id, role, self._timestamp()) for person_id in persons)
+            yield film, genre_links, person_links
+
+
+def _insert(conn: sqlite3.Connection, table: str, rows: list) -> None:
+    if rows:
+        placeholders = ', '.join('?' * len(rows[0]))
+        conn.executemany(f'INSERT INTO {table} VALUES ({placeholders})', rows)
+
+
+def generate(output: Path, films: int, dirty_ratio: float = 0.05, seed: int = 42) -> dict:
+    """Writes a new SQLite file at ``output`` and returns the row count per table."""
+    if output.exists():
+        raise FileExistsError(f'{output} already exists')
+    generator = SqliteSourceGenerator(films, dirty_ratio, seed)
+    counts = dict.fromkeys(('genre', 'person', 'film_work', 'genre_film_work', 'person_film_work'), 0)
+
+    with sqlite3.connect(output) as conn:
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        conn.executescript(SCHEMA)
+
+        genres = list(generator.genres())
+        persons = list(generator.persons())
+        _insert(conn, 'genre', genres)
+        _insert(conn, 'person', persons)
+        counts['genre'], counts['person'] = len(genres), len(persons)
+
+        batches = {'film_work': [], 'genre_film_work': [], 'person_film_work': []}
+        for number, (film, genre_links, person_links) in enumerate(generator.films_with_links(), 1):
+            batches['film_work'].append(film)
+            batches['genre_film_work'].extend(genre_links)
+            batches['person_film_work'].extend(person_links)
+            if number % INSERT_BATCH_SIZE == 0 or number == films:
+                for table, rows in batches.items():
+                    _insert(conn, table, rows)
+                    counts[table] += len(rows)
+                    rows.clear()
+                logger.info(f'Generated {number}/{films} films')
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--films', type=int, default=100_000)
+    parser.add_argument('--output', type=Path, required=True)
+    parser.add_argument('--dirty-ratio', type=float, default=0.05, help='share of values written in a dirty form')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    setup_logging()
+    started = time.monotonic()
+    counts = generate(args.output, args.films, args.dirty_ratio, args.seed)
+    logger.info(f"Wrote {', '.join(f'{count} {table}' for table, count in counts.items())} "
+                f"to {args.output} in {time.monotonic() - started:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
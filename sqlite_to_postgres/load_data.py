@@ -6,12 +6,13 @@ import psycopg
 from psycopg.rows import dict_row
 
 from .logging_config import setup_logging
-from .migrator import process_table
+from .migrator import migrate_tables_checkpointed, migrate_tables_parallel, process_table
 from .es_loader import ElasticsearchLoader
-from .settings import MIGRATION_ORDER, SQLITE_DB_PATH, BASE_DIR, BATCH_SIZE
+from .settings import (MIGRATION_ORDER, MIGRATION_STATE_FILE, MIGRATION_VERIFY, MIGRATION_WORKERS, SQLITE_DB_PATH,
+                       BASE_DIR, BATCH_SIZE)
+from .state import JsonFileStorage, State
+from .verify import verify_migration
 
-# Настраиваем логирование через отдельный модуль
-setup_logging()
 
 logger = logging.getLogger(__name__)
 
@@ -63,13 +64,33 @@ def migrate_data(pg_dsl: dict):
                 setup_postgres_schema(pg_conn)
             logger.info("Schema setup transaction committed.")
 
-            # 2. Run the main migration in a single, large transaction.
-            with pg_conn.transaction():
-                logger.info("Beginning main data migration transaction.")
-                for table_name in MIGRATION_ORDER:
-                    process_table(table_name, sqlite_conn, pg_conn)
+            # 2. Run the main migration in a single, large transaction, in
+            # committed chunks that a rerun resumes, or table by table in
+            # parallel with a single final merge.
+            if MIGRATION_STATE_FILE:
+                logger.info(f"Beginning checkpointed data migration, state in {MIGRATION_STATE_FILE}.")
+                state = State(JsonFileStorage(MIGRATION_STATE_FILE))
+                migrate_tables_checkpointed(sqlite_conn, pg_conn, SQLITE_DB_PATH, state)
+            elif MIGRATION_WORKERS > 1:
+                logger.info(f"Beginning parallel data migration with {MIGRATION_WORKERS} workers.")
+                migrate_tables_parallel(pg_dsl, pg_conn, SQLITE_DB_PATH, MIGRATION_WORKERS)
+            else:
+                with pg_conn.transaction():
+                    logger.info("Beginning main data migration transaction.")
+                    for table_name in MIGRATION_ORDER:
+                        process_table(table_name, sqlite_conn, pg_conn)
             logger.info("Full data migration transaction committed successfully.")
 
+            if MIGRATION_VERIFY:
+                logger.info("Verifying every migrated row against the source...")
+                with pg_conn.transaction():
+                    mismatches = verify_migration(sqlite_conn, pg_conn)
+                for table_name, rows in mismatches.items():
+                    logger.error(f"{len(rows)} rows of {table_name} do not match the source, first: {rows[:10]}")
+                if mismatches:
+                    raise RuntimeError(f"Verification failed for tables: {', '.join(mismatches)}")
+                logger.info("All migrated rows match the source.")
+
             # 3. Index data into Elasticsearch
             logger.info("Starting Elasticsearch indexing...")
             es_loader = ElasticsearchLoader(pg_dsl)
@@ -86,12 +107,17 @@ def migrate_data(pg_dsl: dict):
     except (sqlite3.Error, psycopg.Error) as e:
         logger.critical(f"Database error during migration: {e}", exc_info=True)
         logger.warning("PostgreSQL transaction has been rolled back due to a database error.")
+        # run_etl must not mark the migration as done; a checkpointed one resumes on the next start.
+        raise
     except Exception as e:
         logger.critical(f"An unexpected error occurred during migration: {e}", exc_info=True)
         logger.warning("PostgreSQL transaction has been rolled back due to an unexpected error.")
+        raise
     finally:
         logger.info("Data migration process finished. Database connections are closed.")
 
 if __name__ == '__main__':
     from .settings import get_pg_dsl
+    # Importing the module (run_etl, benchmarks) must not configure logging.
+    setup_logging()
     migrate_data(get_pg_dsl())
\ No newline at end of file
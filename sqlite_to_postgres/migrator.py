@@ -1,25 +1,49 @@
 import logging
+import sqlite3
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from contextlib import closing
+from pathlib import Path
 
-from .etl import (extract_sqlite_data, load_to_postgres, test_data_transfer,
-                 transform_to_dataclass)
-from .settings import TABLE_CONFIGS
+import psycopg
+from psycopg.rows import dict_row
+from psycopg.sql import SQL, Identifier
+
+from .etl import (copy_to_postgres, extract_sqlite_data, load_to_postgres,
+                  merge_into_postgres, test_data_transfer,
+                  transform_to_dataclass)
+from .settings import (LOADER, LOADERS, MIGRATION_CHUNK_ROWS, MIGRATION_ORDER,
+                       MIGRATION_WORKERS, TABLE_CONFIGS)
+from .state import State
 
 logger = logging.getLogger(__name__)
 
 
-def process_table(table_name: str, sqlite_conn, pg_conn):
+# Suffix of the tables the parallel migration loads into before the final merge,
+# followed by an id of the run, so that concurrent runs do not share them.
+STAGING_SUFFIX = "_migration"
+
+
+def process_table(table_name: str, sqlite_conn, pg_conn, loader: str = LOADER, target_table: str | None = None,
+                  rowid_range: tuple[int, int] | None = None):
     """
-    Processes a single table: extracts, transforms, loads, and tests data. 
+    Processes a single table: extracts, transforms, loads, and tests data.
+    ``loader`` picks the load path, see settings.LOADERS; ``target_table``
+    replaces the PG table of the same name as the destination. With
+    ``rowid_range`` (first, last) only the SQLite rows with first < rowid <= last
+    are loaded, and the test is left to the caller.
     The commit is handled by the caller to ensure transactional integrity.
     """
+    if loader not in LOADERS:
+        raise ValueError(f"Unknown loader '{loader}', expected one of: {', '.join(LOADERS)}")
     if table_name not in TABLE_CONFIGS:
         logger.warning(f"No configuration found for table {table_name}, skipping.")
         return
 
     config = TABLE_CONFIGS[table_name]
     sqlite_source_table = config["sqlite_source_table"]
-    pg_target_table = table_name
+    pg_target_table = target_table or table_name
 
     logger.info(f"--- Processing SQLite table '{sqlite_source_table}' -> PG table '{pg_target_table}' ---")
 
@@ -29,22 +53,34 @@ def process_table(table_name: str, sqlite_conn, pg_conn):
 
         data_to_load_generator = (
             transform_to_dataclass(batch, config)
-            for batch in extract_sqlite_data(sqlite_cur, sqlite_source_table)
+            for batch in extract_sqlite_data(sqlite_cur, sqlite_source_table, rowid_range)
         )
 
-        for transformed_batch in data_to_load_generator:
-            if transformed_batch:
-                load_to_postgres(
-                    pg_cur,
-                    pg_target_table,
-                    config["columns"],
-                    transformed_batch,
-                    config.get("conflict_target", "id")
-                )
+        if loader == 'copy':
+            copy_to_postgres(
+                pg_cur,
+                pg_target_table,
+                config["columns"],
+                data_to_load_generator,
+                config.get("conflict_target", "id")
+            )
+        else:
+            for transformed_batch in data_to_load_generator:
+                if transformed_batch:
+                    load_to_postgres(
+                        pg_cur,
+                        pg_target_table,
+                        config["columns"],
+                        transformed_batch,
+                        config.get("conflict_target", "id")
+                    )
 
         # The commit is now handled by the calling function (migrate_data)
         logger.info(f"Data loading complete for PG table: {pg_target_table}")
 
+    if rowid_range is not None:
+        return
+
     # Data validation
     with closing(sqlite_conn.cursor()) as sqlite_cur_test, \
             closing(pg_conn.cursor()) as pg_cur_test:
@@ -56,4 +92,142 @@ def process_table(table_name: str, sqlite_conn, pg_conn):
             config,
         )
 
-    logger.info(f"--- Successfully processed and tested data from '{sqlite_source_table}' to '{pg_target_table}' ---")
\ No newline at end of file
+    logger.info(f"--- Successfully processed and tested data from '{sqlite_source_table}' to '{pg_target_table}' ---")
+
+
+def _staging_table(table_name: str, run_id: str) -> str:
+    return f"{table_name}{STAGING_SUFFIX}_{run_id}"
+
+
+def _load_staging_table(table_name: str, run_id: str, pg_dsl: dict, sqlite_path: Path, loader: str) -> float:
+    """
+    Runs in a worker process: loads one table into its own unlogged copy,
+    with the same primary key and unique indexes but no foreign keys, and commits it.
+    Returns the elapsed seconds.
+    """
+    started = time.monotonic()
+    staging_table = _staging_table(table_name, run_id)
+    with closing(sqlite3.connect(sqlite_path)) as sqlite_conn, \
+            psycopg.connect(**pg_dsl, row_factory=dict_row, options='-c search_path=content') as pg_conn:
+        sqlite_conn.row_factory = sqlite3.Row
+        with pg_conn.transaction():
+            pg_conn.execute(SQL("CREATE UNLOGGED TABLE {staging} (LIKE {table} INCLUDING DEFAULTS INCLUDING INDEXES)").format(
+                staging=Identifier(staging_table), table=Identifier(table_name),
+            ))
+            process_table(table_name, sqlite_conn, pg_conn, loader, target_table=staging_table)
+    return time.monotonic() - started
+
+
+def _drop_staging_tables(pg_conn, tables: list[str], run_id: str):
+    with pg_conn.transaction(), closing(pg_conn.cursor()) as pg_cur:
+        for table_name in tables:
+            pg_cur.execute(SQL("DROP TABLE IF EXISTS {staging}").format(staging=Identifier(_staging_table(table_name, run_id))))
+
+
+def migrate_tables_parallel(pg_dsl: dict, pg_conn, sqlite_path: Path,
+                            workers: int = MIGRATION_WORKERS, loader: str = LOADER):
+    """
+    Migrates MIGRATION_ORDER with up to ``workers`` tables at a time. A table
+    starts as soon as the tables in its "depends_on" are loaded, each in a
+    separate process and connection, into a staging copy (_load_staging_table).
+    The copies are then merged into the real tables in one transaction on
+    ``pg_conn`` and dropped, so the target gets all tables or none: a failed
+    table or a foreign key violation in the merge leaves it untouched.
+    """
+    if pg_conn.info.transaction_status != psycopg.pq.TransactionStatus.IDLE:
+        # The merge would become a savepoint of the caller's transaction, and
+        # the workers would wait on its locks.
+        raise RuntimeError("migrate_tables_parallel() needs a connection outside of a transaction")
+    run_id = uuid.uuid4().hex[:12]
+    pending = list(MIGRATION_ORDER)
+    loaded = set()
+    running = {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while pending or running:
+                for table_name in [t for t in pending if set(TABLE_CONFIGS[t]["depends_on"]) <= loaded]:
+                    pending.remove(table_name)
+                    running[executor.submit(_load_staging_table, table_name, run_id, pg_dsl, sqlite_path, loader)] = table_name
+                    logger.info(f"Started loading table {table_name}.")
+                if not running:
+                    raise ValueError(f"Unsatisfiable dependencies for tables: {', '.join(pending)}")
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    table_name = running.pop(future)
+                    # Re-raises the worker's error; the executor waits for the
+                    # running tables and nothing new is started.
+                    elapsed = future.result()
+                    loaded.add(table_name)
+                    logger.info(f"Table {table_name} loaded into staging in {elapsed:.1f}s.")
+
+        with pg_conn.transaction(), closing(pg_conn.cursor()) as pg_cur:
+            for table_name in MIGRATION_ORDER:
+                config = TABLE_CONFIGS[table_name]
+                merge_into_postgres(
+                    pg_cur,
+                    table_name,
+                    _staging_table(table_name, run_id),
+                    config["columns"],
+                    config.get("conflict_target", "id")
+                )
+        logger.info("Staging tables merged, migration committed.")
+    finally:
+        _drop_staging_tables(pg_conn, MIGRATION_ORDER, run_id)
+
+
+def _source_fingerprint(sqlite_path: Path) -> str:
+    stat = Path(sqlite_path).stat()
+    return f"{Path(sqlite_path).resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _next_chunk_end(sqlite_conn, table_name: str, after_rowid: int, chunk_rows: int) -> int | None:
+    """The last rowid of the next chunk of up to ``chunk_rows`` rows, None when no rows are left."""
+    sqlite_table = TABLE_CONFIGS[table_name]["sqlite_source_table"]
+    with closing(sqlite_conn.cursor()) as sqlite_cur:
+        sqlite_cur.execute(
+            f"SELECT max(rowid) FROM (SELECT rowid FROM {sqlite_table} WHERE rowid > ? ORDER BY rowid LIMIT ?)",
+            (after_rowid, chunk_rows),
+        )
+        return sqlite_cur.fetchone()[0]
+
+
+def migrate_tables_checkpointed(sqlite_conn, pg_conn, sqlite_path: Path, state: State,
+                                chunk_rows: int = MIGRATION_CHUNK_ROWS, loader: str = LOADER):
+    """
+    Migrates MIGRATION_ORDER table by table in committed chunks of SQLite rows
+    keyed by rowid. After each commit the last loaded rowid of the table is
+    saved in ``state``, and a rerun with the same state and source file starts
+    after it; a different source file starts over. A crash between a commit
+    and the save reloads one chunk, which the loaders' ON CONFLICT DO NOTHING
+    makes harmless. Tables are completed in dependency order, so the foreign
+    keys of every chunk are satisfied. Finally every table is checked to be
+    loaded up to the last source rowid and tested as in process_table.
+    """
+    if pg_conn.info.transaction_status != psycopg.pq.TransactionStatus.IDLE:
+        raise RuntimeError("migrate_tables_checkpointed() commits chunks and needs a connection outside of a transaction")
+    fingerprint = _source_fingerprint(sqlite_path)
+    if state.get_state("migration_source") != fingerprint:
+        logger.info(f"No checkpoints for {fingerprint}, migrating from the start.")
+        state.set_state("migration_checkpoints", {})
+        state.set_state("migration_source", fingerprint)
+    checkpoints = dict(state.get_state("migration_checkpoints"))
+
+    for table_name in MIGRATION_ORDER:
+        last_rowid = checkpoints.get(table_name, 0)
+        if last_rowid:
+            logger.info(f"Resuming table {table_name} after rowid {last_rowid}.")
+        while (chunk_end := _next_chunk_end(sqlite_conn, table_name, last_rowid, chunk_rows)) is not None:
+            with pg_conn.transaction():
+                process_table(table_name, sqlite_conn, pg_conn, loader, rowid_range=(last_rowid, chunk_end))
+            last_rowid = checkpoints[table_name] = chunk_end
+            state.set_state("migration_checkpoints", checkpoints)
+            logger.info(f"Committed table {table_name} up to rowid {chunk_end}.")
+
+    # Verification: nothing was left behind, and the tables match their sources.
+    for table_name in MIGRATION_ORDER:
+        config = TABLE_CONFIGS[table_name]
+        if _next_chunk_end(sqlite_conn, table_name, checkpoints.get(table_name, 0), 1) is not None:
+            raise RuntimeError(f"Table {table_name} has source rows after its last checkpoint")
+        with pg_conn.transaction(), closing(sqlite_conn.cursor()) as sqlite_cur, closing(pg_conn.cursor()) as pg_cur:
+            test_data_transfer(sqlite_cur, pg_cur, table_name, config["sqlite_source_table"], config)
+    logger.info("Checkpointed migration complete and verified.")
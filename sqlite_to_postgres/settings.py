@@ -23,7 +23,8 @@ ES_INDEX_MOVIES = 'movies'
 ES_INDEX_PERSONS = 'persons'
 
 BASE_DIR = Path(__file__).resolve().parent.parent
-SQLITE_DB_PATH = BASE_DIR / 'sqlite_to_postgres/db.sqlite'
+# Point at a file from generate_sqlite to migrate a synthetic catalog.
+SQLITE_DB_PATH = Path(os.getenv('SQLITE_DB_PATH', BASE_DIR / 'sqlite_to_postgres/db.sqlite'))
 
 # --- Logging settings ---
 LOG_DIR = BASE_DIR / 'logs'
@@ -32,6 +33,22 @@ LOG_DIR.mkdir(parents=True, exist_ok=True) # Ensure the log directory exists
 
 # --- ETL settings ---
 BATCH_SIZE = 100
+# 'copy' streams each table into a staging table and merges it in one statement;
+# 'insert' is the original path, executemany of INSERT ... ON CONFLICT per batch.
+LOADERS = ('copy', 'insert')
+LOADER = os.getenv('ETL_LOADER', 'copy')
+# Tables loaded at the same time, each on its own connection; 1 keeps the
+# original single-transaction run. The parallel run writes every row twice
+# (staging copy, then the merge), so it only pays off with spare cores and is
+# opt-in. Three tables have no dependencies.
+MIGRATION_WORKERS = int(os.getenv('ETL_WORKERS', 1))
+# A JSON state file turns on the checkpointed migration: every table is loaded
+# in committed chunks of MIGRATION_CHUNK_ROWS SQLite rows, and a rerun
+# continues after the last committed chunk.
+MIGRATION_STATE_FILE = os.getenv('ETL_MIGRATION_STATE_FILE')
+MIGRATION_CHUNK_ROWS = int(os.getenv('ETL_MIGRATION_CHUNK_ROWS', 50000))
+# Compare every migrated row with its source afterwards (sqlite_to_postgres.verify).
+MIGRATION_VERIFY = os.getenv('ETL_VERIFY', '1') == '1'
 ETL_SLEEP_INTERVAL = int(os.getenv('ETL_SLEEP_INTERVAL', 60)) # в секундах
 
 # --- Migration configuration ---
@@ -42,6 +59,7 @@ def _create_table_config(
     conflict_target: str,
     map_modified: bool = True,
     drop_columns: list[str] | None = None,
+    depends_on: list[str] | None = None,
 ):
     """Factory function to reduce repetition in table configurations."""
     config = {
@@ -51,6 +69,7 @@ def _create_table_config(
         "pk_column": "id",
         "conflict_target": conflict_target,
         "column_mappings": {"created_at": "created"},
+        "depends_on": depends_on or [],
     }
     if map_modified:
         config["column_mappings"]["updated_at"] = "modified"
@@ -83,12 +102,14 @@ TABLE_CONFIGS = {
         GenreFilmWork,
         "film_work_id, genre_id",
         map_modified=False,
+        depends_on=["genre", "film_work"],
     ),
     "person_film_work": _create_table_config(
         "person_film_work",
         PersonFilmWork,
         "film_work_id, person_id, role",
         map_modified=False,
+        depends_on=["person", "film_work"],
     ),
 }
 
@@ -0,0 +1,238 @@
+"""
+Full-table verification of a migration by range checksums.
+
+    python -m sqlite_to_postgres.verify [--sqlite movies.sqlite] [--table person_film_work]
+
+Every row of a table is reduced to a canonical text (the values as the
+dataclasses hold them: UUIDs, UTC timestamps with microseconds, ISO dates,
+ratings rounded to 6 places, NULL as \\N). Its digest is the first 8 bytes of
+the md5 of that text as a signed integer. Rows are grouped into ranges by the
+leading hex digits of their primary key, and a range is summarized by its row
+count and the sum of its digests, which does not depend on the row order.
+
+Postgres computes the summaries in SQL, SQLite rows are streamed through the
+migration's own transform, and the first pass groups the whole table on both
+sides in one sequential scan each. Only the ranges that differ are split by
+one more digit and summarized again through the primary key indexes, until
+they are small enough to compare row by row.
+
+The range queries on SQLite compare the id text, so they expect ids written
+as canonical lowercase UUIDs, as the source exports are.
+"""
+import argparse
+import hashlib
+import logging
+import sqlite3
+from collections import defaultdict
+from contextlib import closing
+from dataclasses import dataclass, fields
+from datetime import date, datetime, timezone
+from decimal import ROUND_HALF_UP, Decimal
+from operator import attrgetter
+from uuid import UUID
+
+import psycopg
+from psycopg.rows import tuple_row
+from psycopg.sql import SQL, Identifier
+
+from .etl import transform_to_dataclass
+from .logging_config import setup_logging
+from .settings import BATCH_SIZE, MIGRATION_ORDER, SQLITE_DB_PATH, TABLE_CONFIGS, get_pg_dsl
+
+logger = logging.getLogger(__name__)
+
+# 256 ranges in the first pass.
+FIRST_PASS_DIGITS = 2
+# Ranges with at most this many rows on both sides are compared row by row.
+ROW_LEVEL_ROWS = 256
+NULL_TEXT = '\\N'
+SEPARATOR = '\x1f'
+RATING_PLACES = Decimal('0.000001')
+
+
+@dataclass
+class RowMismatch:
+    id: str
+    problem: str  # 'missing' in Postgres, 'unexpected' in Postgres, or 'different'
+
+
+def _base_type(field_type):
+    """T for an Optional[T] annotation."""
+    if hasattr(field_type, '__args__'):
+        return next(t for t in field_type.__args__ if t is not type(None))
+    return field_type
+
+
+def _format_float(value: float) -> str:
+    # float8::numeric keeps 15 significant digits, and round() rounds halves away from zero.
+    return str(Decimal(f'{value:.15g}').quantize(RATING_PLACES, ROUND_HALF_UP))
+
+
+def _format_datetime(value: datetime) -> str:
+    return value.astimezone(timezone.utc).replace(tzinfo=None).isoformat(sep=' ', timespec='microseconds')
+
+
+# Python formatting and the matching Postgres expression for each field type.
+FORMATS = {
+    UUID: (str, '{}::text'),
+    str: (str, '{}::text'),
+    date: (date.isoformat, "to_char({}, 'YYYY-MM-DD')"),
+    float: (_format_float, 'round({}::numeric, 6)::text'),
+    datetime: (_format_datetime, "to_char({} AT TIME ZONE 'UTC', 'YYYY-MM-DD HH24:MI:SS.US')"),
+}
+
+
+class TableChecksum:
+    """Canonical row text and digests of one table, on both sides."""
+
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+        self.config = TABLE_CONFIGS[table_name]
+        self.pk_column = self.config["pk_column"]
+        data_class = self.config["dataclass"]
+        formats = [(field.name, FORMATS[_base_type(field.type)]) for field in fields(data_class)]
+        self._formatters = [(attrgetter(name), python_format) for name, (python_format, _) in formats]
+        self._pk = attrgetter(self.pk_column)
+        row_text = SQL(" || chr(31) || ").join(
+            SQL("coalesce({}, {})").format(SQL(sql_format.replace('{}', '{column}')).format(column=Identifier(name)),
+                                           NULL_TEXT)
+            for name, (_, sql_format) in formats
+        )
+        self._pg_digest = SQL("('x' || substr(md5({row_text}), 1, 16))::bit(64)::bigint").format(row_text=row_text)
+
+    def row_text(self, record) -> str:
+        values = ((getter(record), python_format) for getter, python_format in self._formatters)
+        return SEPARATOR.join(NULL_TEXT if value is None else python_format(value) for value, python_format in values)
+
+    def digest(self, record) -> int:
+        return int.from_bytes(hashlib.md5(self.row_text(record).encode()).digest()[:8], 'big', signed=True)
+
+    # --- SQLite side
+
+    def sqlite_rows(self, sqlite_conn, prefix: str = ''):
+        """Yields (hex id, digest) of the source rows, only those with ids starting with ``prefix`` if given."""
+        with closing(sqlite_conn.cursor()) as sqlite_cur:
+            query = f"SELECT * FROM {self.config['sqlite_source_table']}"
+            if prefix:
+                sqlite_cur.execute(f"{query} WHERE {self.pk_column} BETWEEN ? AND ?", _id_bounds(prefix))
+            else:
+                sqlite_cur.execute(query)
+            while batch := sqlite_cur.fetchmany(BATCH_SIZE):
+                for record in transform_to_dataclass(batch, self.config):
+                    yield self._pk(record).hex, self.digest(record)
+
+    def sqlite_summary(self, sqlite_conn, prefix: str, digits: int) -> dict:
+        summary = defaultdict(lambda: [0, 0])
+        for pk, digest in self.sqlite_rows(sqlite_conn, prefix):
+            totals = summary[pk[:digits]]
+            totals[0] += 1
+            totals[1] += digest
+        return {key: tuple(totals) for key, totals in summary.items()}
+
+    # --- Postgres side
+
+    def _pg_query(self, select: SQL, prefix: str, group_by: SQL | None = None):
+        query = SQL("SELECT {select} FROM {table}").format(select=select, table=Identifier(*self.table_name.split('.')))
+        params = ()
+        if prefix:
+            query += SQL(" WHERE {pk} BETWEEN %s::uuid AND %s::uuid").format(pk=Identifier(self.pk_column))
+            params = _id_bounds(prefix)
+        if group_by is not None:
+            query += SQL(" GROUP BY {}").format(group_by)
+        return query, params
+
+    def pg_rows(self, pg_conn, prefix: str):
+        query, params = self._pg_query(
+            SQL("replace({pk}::text, '-', ''), {digest}").format(pk=Identifier(self.pk_column), digest=self._pg_digest),
+            prefix,
+        )
+        with pg_conn.cursor(row_factory=tuple_row) as pg_cur:
+            pg_cur.execute(query, params)
+            yield from pg_cur
+
+    def pg_summary(self, pg_conn, prefix: str, digits: int) -> dict:
+        bucket = SQL("substr(replace({pk}::text, '-', ''), 1, {digits})").format(
+            pk=Identifier(self.pk_column), digits=digits,
+        )
+        query, params = self._pg_query(
+            SQL("{bucket}, count(*), coalesce(sum({digest}), 0)").format(bucket=bucket, digest=self._pg_digest),
+            prefix,
+            group_by=SQL("1"),
+        )
+        with pg_conn.cursor(row_factory=tuple_row) as pg_cur:
+            pg_cur.execute(query, params)
+            return {key: (count, int(total)) for key, count, total in pg_cur}
+
+
+def _id_bounds(prefix: str) -> tuple[str, str]:
+    """The lowest and highest canonical UUID strings starting with the hex ``prefix``."""
+    return tuple(str(UUID(prefix.ljust(32, pad))) for pad in '0f')
+
+
+def verify_table(table_name: str, sqlite_conn, pg_conn,
+                 first_pass_digits: int = FIRST_PASS_DIGITS, row_level_rows: int = ROW_LEVEL_ROWS) -> list[RowMismatch]:
+    """Compares a migrated table with its source and returns the rows that differ, if any."""
+    checksum = TableChecksum(table_name)
+    mismatches = []
+    # (id prefix, digits to group by) of the ranges still to compare.
+    ranges = [('', first_pass_digits)]
+    while ranges:
+        prefix, digits = ranges.pop()
+        source = checksum.sqlite_summary(sqlite_conn, prefix, digits)
+        target = checksum.pg_summary(pg_conn, prefix, digits)
+        for key in sorted(source.keys() | target.keys()):
+            source_count, _ = source_totals = source.get(key, (0, 0))
+            target_count, _ = target_totals = target.get(key, (0, 0))
+            if source_totals == target_totals:
+                continue
+            if max(source_count, target_count) > row_level_rows and digits < 32:
+                ranges.append((key, digits + 1))
+            else:
+                mismatches.extend(_compare_rows(checksum, sqlite_conn, pg_conn, key))
+    logger.info(f"Verified {table_name}: {len(mismatches)} mismatching rows.")
+    return mismatches
+
+
+def _compare_rows(checksum: TableChecksum, sqlite_conn, pg_conn, prefix: str) -> list[RowMismatch]:
+    source = dict(checksum.sqlite_rows(sqlite_conn, prefix))
+    target = dict(checksum.pg_rows(pg_conn, prefix))
+    mismatches = []
+    for pk in sorted(source.keys() | target.keys()):
+        if pk not in target:
+            mismatches.append(RowMismatch(str(UUID(pk)), 'missing'))
+        elif pk not in source:
+            mismatches.append(RowMismatch(str(UUID(pk)), 'unexpected'))
+        elif source[pk] != target[pk]:
+            mismatches.append(RowMismatch(str(UUID(pk)), 'different'))
+    return mismatches
+
+
+def verify_migration(sqlite_conn, pg_conn, tables: list[str] = MIGRATION_ORDER) -> dict[str, list[RowMismatch]]:
+    """Runs verify_table for every table and returns the mismatches of those that differ."""
+    results = {}
+    for table_name in tables:
+        mismatches = verify_table(table_name, sqlite_conn, pg_conn)
+        if mismatches:
+            results[table_name] = mismatches
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sqlite', default=SQLITE_DB_PATH, help='source file, SQLITE_DB_PATH by default')
+    parser.add_argument('--table', action='append', choices=MIGRATION_ORDER, help='verify only these tables (repeatable)')
+    args = parser.parse_args()
+
+    setup_logging()
+    with closing(sqlite3.connect(args.sqlite)) as sqlite_conn, \
+            psycopg.connect(**get_pg_dsl(), options='-c search_path=content') as pg_conn:
+        sqlite_conn.row_factory = sqlite3.Row
+        results = verify_migration(sqlite_conn, pg_conn, args.table or MIGRATION_ORDER)
+    for table_name, mismatches in results.items():
+        for mismatch in mismatches:
+            print(f'{table_name}\t{mismatch.id}\t{mismatch.problem}')
+    raise SystemExit(1 if results else 0)
+
+
+if __name__ == '__main__':
+    main()